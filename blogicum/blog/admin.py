@@ -1,29 +1,152 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.template.response import TemplateResponse
+from django.utils import timezone
 
+from . import page_cache
 from .models import Category, Location, Post
+from .pagination import EstimatedCountPaginator
 
 admin.site.empty_value_display = 'Не задано'
 
 
+class EstimatedCountAdmin(admin.ModelAdmin):
+    """Список без точных COUNT(*) по большим таблицам.
+
+    Число записей оценивается ``EstimatedCountPaginator``, а второй
+    подсчёт всей таблицы ради подписи «из N» отключён.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(EstimatedCountAdmin):
     list_display = ('title', 'description',
                     'slug', 'is_published', 'created_at')
     list_editable = ('description', 'slug', 'is_published')
     list_display_links = ('title',)
+    search_fields = ('title',)
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(EstimatedCountAdmin):
     list_display = ('name', 'is_published', 'created_at')
     list_editable = ('is_published',)
     list_display_links = ('name',)
+    search_fields = ('name',)
+
+
+class RecategorizeForm(forms.Form):
+    category = forms.ModelChoiceField(
+        Category.objects.all(), label='Категория')
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, подписывающее выбранное значение готовым объектом.
+
+    Обычный виджет выбирает подпись отдельным запросом, то есть в списке
+    объектов — по запросу на каждую строку. Если форма передала объект в
+    ``selected`` (он уже загружен через ``list_select_related``), запроса
+    нет.
+    """
+
+    selected = ()
+
+    def optgroups(self, name, value, attr=None):
+        if not self.selected:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        obj = self.selected[0]
+        if obj is not None:
+            label = self.choices.field.label_from_instance(obj)
+            options.append(self.create_option(
+                name, obj.pk, label, True, len(options)))
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in PostAdmin.autocomplete_fields:
+            field = self.fields[name]
+            relation = self.instance._meta.get_field(name)
+            # После ошибки в списке показываем отправленное значение.
+            if not self.is_bound and relation.is_cached(self.instance):
+                # Виджет обёрнут в RelatedFieldWidgetWrapper со ссылками.
+                widget = getattr(field.widget, 'widget', field.widget)
+                widget.selected = (getattr(self.instance, name),)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'text', 'pub_date', 'author',
+class PostAdmin(EstimatedCountAdmin):
+    list_display = ('title', 'excerpt', 'pub_date', 'author',
                     'location', 'category', 'is_published', 'created_at')
-    list_editable = ('text', 'pub_date', 'author',
-                     'location', 'category', 'is_published')
+    # Связи — автодополнение, а не select со всеми пользователями в каждой
+    # строке, и подписи берутся из list_select_related без запросов.
+    list_editable = ('pub_date', 'author', 'location', 'category',
+                     'is_published')
     list_display_links = ('title',)
+    list_select_related = ('author', 'location', 'category')
+    autocomplete_fields = ('author', 'location', 'category')
+    search_fields = ('title',)
+    actions = ('publish', 'unpublish', 'recategorize')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = LoadedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def bulk_update(self, request, queryset, message, **fields):
+        """Меняет выбранные посты одним UPDATE."""
+        count = queryset.update(updated_at=timezone.now(), **fields)
+        # update() не отправляет сигналов: сбрасываем кеш страниц сами.
+        page_cache.bump(page_cache.GLOBAL_SCOPE)
+        self.message_user(
+            request, message.format(count=count), messages.SUCCESS)
+
+    @admin.action(description='Опубликовать выбранные посты')
+    def publish(self, request, queryset):
+        self.bulk_update(
+            request, queryset, 'Опубликовано постов: {count}.',
+            is_published=True)
+
+    @admin.action(description='Снять выбранные посты с публикации')
+    def unpublish(self, request, queryset):
+        self.bulk_update(
+            request, queryset, 'Снято с публикации постов: {count}.',
+            is_published=False)
+
+    @admin.action(description='Перенести выбранные посты в категорию')
+    def recategorize(self, request, queryset):
+        form = RecategorizeForm(request.POST if 'apply' in request.POST
+                                else None)
+        if form.is_bound and form.is_valid():
+            self.bulk_update(
+                request, queryset, 'Перенесено постов: {count}.',
+                category=form.cleaned_data['category'])
+            return None
+        selected = request.POST.getlist(helpers.ACTION_CHECKBOX_NAME)
+        select_across = request.POST.get('select_across') == '1'
+        return TemplateResponse(
+            request, 'admin/blog/post/recategorize.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Перенос постов в категорию',
+                'opts': self.model._meta,
+                'form': form,
+                'selected': selected,
+                'select_across': select_across,
+                'selected_count': (
+                    queryset.count() if select_across else len(selected)),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            })
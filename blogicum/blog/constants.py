@@ -2,3 +2,7 @@ MAX_STR_LENGHT = 256
 MAX_STR_LENGTH_POST = 200
 MAX_STR_LENGTH_CATEGORY = 64
 PAGINATE_COUNT = 10
+PAGINATE_ON_EACH_SIDE = 2
+PAGINATE_ON_ENDS = 1
+COMMENTS_PAGINATE_COUNT = 50
+EXCERPT_WORDS = 10
@@ -0,0 +1,169 @@
+"""Потоковая выгрузка блога в JSONL для аналитики.
+
+Строки читаются через ``QuerySet.iterator()`` (на PostgreSQL это
+курсор на стороне сервера) и сразу пишутся в файл, поэтому память не
+растёт с размером таблиц. Формат записи совпадает с ``dumpdata``,
+так что выгрузку можно загрузить обратно командой ``fastload``.
+"""
+import gzip
+import json
+from pathlib import Path
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+EXPORT_MODELS = (
+    'blog.category', 'blog.location', 'blog.post', 'blog.comment')
+# Поле, по которому выгрузка «с момента» находит новые и изменённые строки.
+CHANGED_FIELDS = {'blog.post': 'updated_at'}
+
+
+def export_queryset(model, since=None, after_id=None):
+    """Строки модели для выгрузки в порядке первичного ключа.
+
+    ``since`` отбирает строки, созданные или изменённые с этого момента,
+    ``after_id`` — строки с большим ключом; вместе условия объединяются
+    через ИЛИ, как при продолжении выгрузки по сохранённой отметке.
+    """
+    label = model._meta.label_lower
+    queryset = model._default_manager.order_by('pk')
+    conditions = Q()
+    if since is not None:
+        field = CHANGED_FIELDS.get(label, 'created_at')
+        conditions |= Q(**{f'{field}__gte': since})
+    if after_id is not None:
+        conditions |= Q(pk__gt=after_id)
+    return queryset.filter(conditions)
+
+
+def iter_rows(queryset, chunk_size):
+    """Пары ``(pk, строка JSONL)`` без создания экземпляров модели."""
+    model = queryset.model
+    label = model._meta.label_lower
+    fields = [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+    ]
+    attnames = ['pk', *(field.attname for field in fields)]
+    names = [field.name for field in fields]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    rows = queryset.values_list(*attnames).iterator(chunk_size=chunk_size)
+    for pk, *values in rows:
+        fields = dict(zip(names, values))
+        record = {'model': label, 'pk': pk, 'fields': fields}
+        yield pk, encoder.encode(record) + '\n'
+
+
+class SplitWriter:
+    """Пишет строки в ``stem-0001.jsonl``, ``stem-0002.jsonl``…
+
+    Новый файл начинается, когда текущий достиг ``max_bytes``. Для gzip
+    считается размер сжатых данных, поэтому граница приблизительная:
+    часть данных ещё лежит в буфере компрессора.
+    """
+
+    def __init__(self, path, max_bytes=None, compress=False):
+        path = Path(path)
+        suffixes = ''.join(path.suffixes)
+        self.stem = path.parent / path.name[:len(path.name) - len(suffixes)]
+        self.suffix = '.jsonl.gz' if compress else '.jsonl'
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.paths = []
+        self.raw = self.stream = None
+
+    def _open(self):
+        self.close()
+        if self.max_bytes:
+            path = Path(f'{self.stem}-{len(self.paths) + 1:04d}{self.suffix}')
+        else:
+            path = Path(f'{self.stem}{self.suffix}')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.raw = open(path, 'wb')
+        self.stream = (
+            gzip.GzipFile(fileobj=self.raw, mode='wb') if self.compress
+            else self.raw
+        )
+        self.paths.append(path)
+
+    def write(self, line):
+        if self.stream is None or (
+                self.max_bytes and self.raw.tell() >= self.max_bytes):
+            self._open()
+        self.stream.write(line.encode('utf-8'))
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+            if self.stream is not self.raw:
+                self.raw.close()
+            self.raw = self.stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.paths:
+            # Пустая выгрузка — тоже файл: потребитель увидит, что
+            # новых строк нет.
+            self._open()
+        self.close()
+
+
+class StreamWriter:
+    """Выгрузка в открытый текстовый поток, например в stdout."""
+
+    paths = ()
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, line):
+        self.stream.write(line)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stream.flush()
+
+
+def export(writer, labels=EXPORT_MODELS, since=None, watermark=None,
+           after_id=None, chunk_size=2000):
+    """Выгружает модели и возвращает ``{метка: (строк, последний pk)}``.
+
+    ``watermark`` — отметки прошлой выгрузки ``{метка: pk}``: для
+    каждой модели берутся строки с большим ключом.
+    """
+    stats = {}
+    for label in labels:
+        model = apps.get_model(label)
+        last_pk = (watermark or {}).get(label, after_id)
+        queryset = export_queryset(model, since=since, after_id=last_pk)
+        rows = 0
+        for pk, line in iter_rows(queryset, chunk_size):
+            writer.write(line)
+            rows += 1
+            last_pk = pk if last_pk is None else max(last_pk, pk)
+        stats[label] = (rows, last_pk)
+    return stats
+
+
+def read_state(path):
+    """Отметки прошлой выгрузки; пустые, если файла ещё нет."""
+    try:
+        with open(path, encoding='utf-8') as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def write_state(path, exported_at, stats, previous=None):
+    # Отметки моделей, не попавших в эту выгрузку, сохраняются.
+    models = dict((previous or {}).get('models') or {})
+    models.update((label, pk) for label, (_, pk) in stats.items())
+    state = {'exported_at': exported_at.isoformat(), 'models': models}
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(state, fh, indent=2)
@@ -0,0 +1,445 @@
+"""Потоковая загрузка фикстур и дампов блога через ``bulk_create``.
+
+``loaddata`` разбирает файл целиком и сохраняет объекты по одному с
+сигналами. Здесь записи читаются из JSON-массива или JSONL (в том числе
+сжатого gzip) по мере чтения файла, раскладываются по временным файлам
+моделей и вставляются пачками в порядке зависимостей внешних ключей:
+категории, местоположения, пользователи, посты, комментарии.
+"""
+import gzip
+import json
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import page_cache
+from .models import Post, make_excerpt
+
+CHUNK_SIZE = 1 << 16
+GZIP_MAGIC = b'\x1f\x8b'
+_SEPARATORS = ' \t\r\n,'
+
+
+class FixtureError(Exception):
+    pass
+
+
+def load_order():
+    """Метки моделей в порядке, в котором их можно вставлять."""
+    return (
+        'blog.category',
+        'blog.location',
+        get_user_model()._meta.label_lower,
+        'blog.post',
+        'blog.comment',
+    )
+
+
+def open_fixture(path):
+    """Текстовый поток файла; gzip узнаём по сигнатуре, а не расширению."""
+    with open(path, 'rb') as fh:
+        compressed = fh.read(2) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class _Buffer:
+    """Окно чтения потока: дочитывает файл, только когда данных не хватает."""
+
+    def __init__(self, fh, chunk_size):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text = ''
+        self.position = 0
+        self.eof = False
+
+    def refill(self):
+        chunk = self.fh.read(self.chunk_size)
+        self.eof = not chunk
+        self.text = self.text[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Следующий значимый символ или ``None`` в конце потока."""
+        while True:
+            while (self.position < len(self.text)
+                    and self.text[self.position] in _SEPARATORS):
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if self.eof:
+                return None
+            self.refill()
+
+    def skip(self):
+        self.position += 1
+
+    def decode(self):
+        while True:
+            try:
+                record, self.position = self.decoder.raw_decode(
+                    self.text, self.position)
+                return record
+            except json.JSONDecodeError as error:
+                if self.eof:
+                    raise FixtureError(
+                        f'Некорректный JSON: {error.msg}.') from error
+                self.refill()
+
+
+def iter_records(fh, chunk_size=CHUNK_SIZE):
+    """Объекты JSON-массива или JSONL по одному, без разбора всего файла.
+
+    Формат определяется по первому символу: ``[`` — массив ``dumpdata``,
+    иначе — объекты подряд, как в JSONL.
+    """
+    buffer = _Buffer(fh, chunk_size)
+    in_array = buffer.peek() == '['
+    if in_array:
+        buffer.skip()
+    while True:
+        char = buffer.peek()
+        if char is None:
+            if in_array:
+                raise FixtureError('JSON-массив не закрыт.')
+            return
+        if in_array and char == ']':
+            buffer.skip()
+            if buffer.peek() is not None:
+                raise FixtureError('Данные после конца JSON-массива.')
+            return
+        yield buffer.decode()
+
+
+def spool(records, labels):
+    """Раскладывает записи по временным JSONL-файлам моделей.
+
+    Возвращает файлы по меткам, счётчик записей чужих моделей, которые
+    загрузчик пропускает, и поля пропущенных записей из
+    ``NATURAL_KEYS`` по меткам и первичным ключам — по ним переводятся
+    связи «многие ко многим».
+    """
+    files = {}
+    skipped = {}
+    references = {}
+    for record in records:
+        label = str(record.get('model', '')).lower()
+        if label not in labels:
+            skipped[label] = skipped.get(label, 0) + 1
+            if label in NATURAL_KEYS and 'pk' in record:
+                references.setdefault(label, {})[record['pk']] = (
+                    record.get('fields', {}))
+            continue
+        if label not in files:
+            files[label] = tempfile.TemporaryFile(
+                'w+', encoding='utf-8')
+        files[label].write(json.dumps(record, ensure_ascii=False) + '\n')
+    for fh in files.values():
+        fh.seek(0)
+    return files, skipped, references
+
+
+def _content_type_key(fields, resolver):
+    return fields['app_label'], fields['model']
+
+
+def _permission_key(fields, resolver):
+    content_type = fields['content_type']
+    if not isinstance(content_type, list):
+        content_type = resolver.natural_key(
+            'contenttypes.contenttype', content_type)
+    if content_type is None:
+        return None
+    return (fields['codename'], *content_type)
+
+
+def _group_key(fields, resolver):
+    return (fields['name'],)
+
+
+# Естественные ключи записей моделей, которые загрузчик не вставляет, но
+# на которые ссылаются связи пользователей.
+NATURAL_KEYS = {
+    'contenttypes.contenttype': _content_type_key,
+    'auth.permission': _permission_key,
+    'auth.group': _group_key,
+}
+
+
+class RelationResolver:
+    """Переводит ключи связей «многие ко многим» из дампа в ключи базы.
+
+    Связи с моделями, загружаемыми из того же дампа, остаются как есть:
+    их строки вставляются с первичными ключами дампа. Для остальных
+    (права, группы) номер из дампа ничего не говорит о строке базы с тем
+    же номером, поэтому он переводится в естественный ключ по записям
+    дампа — права по коду и типу содержимого, группы по имени, — а тот в
+    первичный ключ базы. Связь, которую так перевести нельзя, не
+    вставляется и попадает в ``dropped``.
+    """
+
+    def __init__(self, references, loaded):
+        self.references = references
+        self.loaded = set(loaded)
+        self.dropped = {}
+        self._targets = {}
+
+    def natural_key(self, label, pk):
+        fields = self.references.get(label, {}).get(pk)
+        if fields is None:
+            return None
+        try:
+            return NATURAL_KEYS[label](fields, self)
+        except KeyError:
+            return None
+
+    def target_pk(self, model, value):
+        label = model._meta.label_lower
+        if isinstance(value, list):
+            key = tuple(value)
+        else:
+            key = self.natural_key(label, value)
+        if key is None:
+            return None
+        if (label, key) not in self._targets:
+            try:
+                target = model._default_manager.get_by_natural_key(*key)
+            except model.DoesNotExist:
+                target = None
+            self._targets[label, key] = getattr(target, 'pk', None)
+        return self._targets[label, key]
+
+    def rewrite(self, model, record):
+        """Запись с ключами связей, переведёнными в ключи базы."""
+        fields = record.get('fields', {})
+        for field in model._meta.many_to_many:
+            values = fields.get(field.name)
+            target = field.related_model
+            if not values or target._meta.label_lower in self.loaded:
+                continue
+            resolved = [
+                pk for pk in (self.target_pk(target, value)
+                              for value in values)
+                if pk is not None
+            ]
+            fields[field.name] = resolved
+            if len(resolved) < len(values):
+                label = field.remote_field.through._meta.label_lower
+                self.dropped[label] = (
+                    self.dropped.get(label, 0) + len(values) - len(resolved))
+        return record
+
+
+def _prepare_post(post):
+    if not post.excerpt:
+        post.excerpt = make_excerpt(post.text)
+
+
+PREPARE = {Post: _prepare_post}
+
+
+def _timestamp_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Отключает ``auto_now`` и ``auto_now_add``: даты берутся из дампа."""
+    fields = _timestamp_fields(model)
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def build_objects(model, lines, timestamps=(), resolver=None):
+    """Несохранённые экземпляры модели из строк временного файла.
+
+    Пустые поля из ``timestamps`` получают текущее время, как при
+    обычном сохранении. Вторым значением возвращаются связи «многие ко
+    многим» (например, группы и права пользователей): пары из объекта и
+    словаря ``{имя поля: [первичные ключи]}``; ключи переводит
+    ``resolver``.
+    """
+    now = timezone.now()
+    prepare = PREPARE.get(model)
+    objects = []
+    relations = []
+    records = (json.loads(line) for line in lines)
+    if resolver is not None:
+        records = (resolver.rewrite(model, record) for record in records)
+    for deserialized in Deserializer(records, ignorenonexistent=True):
+        obj = deserialized.object
+        for field in timestamps:
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, now)
+        if prepare is not None:
+            prepare(obj)
+        objects.append(obj)
+        if deserialized.m2m_data:
+            relations.append((obj, deserialized.m2m_data))
+    return objects, relations
+
+
+def insert_relations(model, relations, ignore_conflicts=False):
+    """Вставляет строки промежуточных таблиц связей «многие ко многим».
+
+    Ключи уже переведены ``RelationResolver``; связи с объектами, которых
+    всё же нет в базе, пропускаются. Возвращает словари вставленных и
+    пропущенных строк по меткам промежуточных моделей.
+    """
+    inserted = {}
+    dropped = {}
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            continue
+        pairs = [
+            (obj.pk, pk) for obj, data in relations
+            for pk in data.get(field.name, ())
+        ]
+        if not pairs:
+            continue
+        existing = set(field.related_model._default_manager.filter(
+            pk__in={pk for _, pk in pairs}).values_list('pk', flat=True))
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(
+            field.m2m_reverse_field_name()).attname
+        rows = [
+            through(**{source: obj_pk, target: pk})
+            for obj_pk, pk in pairs if pk in existing
+        ]
+        through.objects.bulk_create(rows, ignore_conflicts=ignore_conflicts)
+        label = through._meta.label_lower
+        inserted[label] = len(rows)
+        if len(pairs) > len(rows):
+            dropped[label] = len(pairs) - len(rows)
+    return inserted, dropped
+
+
+def _add_counts(total, counts):
+    for label, count in counts.items():
+        total[label] = total.get(label, 0) + count
+
+
+def _batches(fh, batch_size):
+    batch = []
+    for line in fh:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@contextmanager
+def dropped_indexes(models):
+    """Снимает индексы из ``Meta.indexes`` на время загрузки.
+
+    Вставка в таблицу без вторичных индексов быстрее, а один
+    ``CREATE INDEX`` по готовым данным дешевле, чем обновлять индекс
+    на каждой строке. Индексы возвращаются и при ошибке.
+    """
+    dropped = []
+    try:
+        with connection.schema_editor() as editor:
+            for model in models:
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+                    dropped.append((model, index))
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.add_index(model, index)
+
+
+def reset_sequences(models):
+    # Первичные ключи пришли из дампа, и счётчик автоинкремента отстал.
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def recount_comments(batch_size):
+    """Пересчитывает ``comment_count``: ``bulk_create`` обходит сигналы."""
+    posts = Post.objects.order_by('pk').values_list('pk', flat=True)
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1]
+        with transaction.atomic():
+            Post.objects.filter(pk__in=batch).repair_comment_counts()
+
+
+def load(path, batch_size=1000, drop_indexes=False, ignore_conflicts=False,
+         progress=None):
+    """Загружает файл и возвращает статистику по моделям.
+
+    Статистика — словарь ``{метка: (строк, секунд)}`` в порядке загрузки
+    (строки промежуточных таблиц «многие ко многим» учитываются под их
+    метками) и словарь пропущенных записей: других моделей и связей с
+    отсутствующими объектами.
+    """
+    labels = load_order()
+    with ExitStack() as stack:
+        fh = stack.enter_context(open_fixture(path))
+        files, skipped, references = spool(iter_records(fh), labels)
+        resolver = RelationResolver(references, labels)
+        for spooled in files.values():
+            stack.callback(spooled.close)
+        models = [apps.get_model(label) for label in labels if label in files]
+        if drop_indexes:
+            stack.enter_context(dropped_indexes(models))
+        stats = {}
+        for model in models:
+            label = model._meta.label_lower
+            started = time.perf_counter()
+            rows = 0
+            linked = {}
+            with keep_timestamps(model) as timestamps:
+                for lines in _batches(files[label], batch_size):
+                    objects, relations = build_objects(
+                        model, lines, timestamps, resolver)
+                    with transaction.atomic():
+                        model.objects.bulk_create(
+                            objects, ignore_conflicts=ignore_conflicts)
+                        inserted, dropped = insert_relations(
+                            model, relations, ignore_conflicts)
+                    _add_counts(linked, inserted)
+                    _add_counts(skipped, dropped)
+                    rows += len(objects)
+                    if progress is not None:
+                        progress(label, rows)
+            seconds = time.perf_counter() - started
+            stats[label] = (rows, seconds)
+            for through_label, count in linked.items():
+                stats[through_label] = (count, seconds)
+        _add_counts(skipped, resolver.dropped)
+    reset_sequences(models)
+    if 'blog.comment' in stats or 'blog.post' in stats:
+        recount_comments(batch_size)
+    page_cache.bump(page_cache.GLOBAL_SCOPE)
+    return stats, skipped
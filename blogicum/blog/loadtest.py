@@ -0,0 +1,414 @@
+"""Нагрузочный прогон основных страниц блога без внешних сервисов.
+
+Исполнители выбирают сценарии по весам из смеси и отправляют запросы
+либо прямо в приложение — пулом потоков через WSGI-обработчик
+(``django.test.Client``) или задачами asyncio через ASGI-обработчик
+(``django.test.AsyncClient``), в обоих случаях весь стек промежуточных
+слоёв, но без сети, — либо на запущенный локальный сервер по HTTP.
+Итог — запросы в секунду и перцентили задержки по каждому маршруту.
+"""
+import asyncio
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urljoin
+from urllib.request import (HTTPCookieProcessor, HTTPRedirectHandler,
+                            Request, build_opener)
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.shortcuts import resolve_url
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from core.profiling import PERCENTILES, _percentile
+
+from .models import Category, Post
+
+DEFAULT_MIX = {
+    'blog:index': 35,
+    'blog:post_detail': 35,
+    'blog:category_posts': 10,
+    'blog:profile': 10,
+    'blog:add_comment': 10,
+}
+# Сценарии, которым нужен вошедший пользователь.
+AUTH_ONLY = {'blog:add_comment'}
+USERNAME_PREFIX = 'loadtest_user_'
+TARGETS_LIMIT = 1000
+
+
+def parse_mix(value):
+    """Смесь из строки ``маршрут=вес,маршрут=вес``."""
+    mix = {}
+    for item in value.split(','):
+        route, _, weight = item.partition('=')
+        route = route.strip()
+        if route not in DEFAULT_MIX:
+            raise ValueError(f'Неизвестный сценарий: {route}')
+        mix[route] = float(weight or 1)
+    return mix
+
+
+class Targets:
+    """Адреса, по которым ходят сценарии: только опубликованные страницы."""
+
+    def __init__(self, limit=TARGETS_LIMIT):
+        posts = list(
+            Post.objects.published()
+            .values_list('pk', 'author__username', 'category__slug')
+            .order_by('-pub_date')[:limit]
+        )
+        if not posts:
+            raise ValueError('В базе нет опубликованных постов.')
+        self.post_ids = [pk for pk, _, _ in posts]
+        self.usernames = sorted({username for _, username, _ in posts})
+        self.category_slugs = list(
+            Category.objects.filter(is_published=True, slug__in={
+                slug for _, _, slug in posts})
+            .values_list('slug', flat=True))
+
+    def supports(self, route):
+        # Посты могут быть без категории, тогда сценарию некуда идти.
+        return route != 'blog:category_posts' or bool(self.category_slugs)
+
+    def request(self, route, rng):
+        """Метод, путь и данные формы для сценария."""
+        if route == 'blog:index':
+            return 'GET', reverse(route), None
+        if route == 'blog:post_detail':
+            return 'GET', reverse(
+                route, args=[rng.choice(self.post_ids)]), None
+        if route == 'blog:category_posts':
+            return 'GET', reverse(
+                route, args=[rng.choice(self.category_slugs)]), None
+        if route == 'blog:profile':
+            return 'GET', reverse(
+                route, args=[rng.choice(self.usernames)]), None
+        if route == 'blog:add_comment':
+            return 'POST', reverse(
+                route, args=[rng.choice(self.post_ids)]), {
+                    'text': 'Комментарий нагрузочного теста'}
+        raise ValueError(route)
+
+
+def ensure_users(count, password):
+    """Пользователи для сценариев с входом; недостающие создаются."""
+    User = get_user_model()
+    usernames = [f'{USERNAME_PREFIX}{index}' for index in range(count)]
+    existing = set(User.objects.filter(
+        username__in=usernames).values_list('username', flat=True))
+    # Хеш считаем один раз: PBKDF2 на каждого пользователя слишком долог.
+    hashed = make_password(password)
+    User.objects.bulk_create([
+        User(username=username, password=hashed)
+        for username in usernames if username not in existing
+    ])
+    User.objects.filter(username__in=usernames).update(password=hashed)
+    return usernames
+
+
+class InProcessTransport:
+    """Запросы прямо в WSGI-обработчик Django, без сети.
+
+    Исключение во view не прерывает прогон: как и настоящий сервер,
+    клиент отдаёт ответ 500, и он считается ошибкой в отчёте.
+    """
+
+    def __init__(self, username=None):
+        self.client = Client(raise_request_exception=False)
+        if username is not None:
+            self.client.force_login(
+                get_user_model().objects.get(username=username))
+
+    def send(self, method, path, data):
+        if method == 'POST':
+            return self.client.post(path, data).status_code
+        return self.client.get(path).status_code
+
+    def close(self):
+        # Каждый поток открывает своё соединение с базой.
+        connections.close_all()
+
+
+class AsyncInProcessTransport:
+    """Запросы в ASGI-обработчик Django через ``AsyncClient``, без сети.
+
+    Как и ``InProcessTransport``, исключение во view даёт ответ 500.
+    """
+
+    def __init__(self, username=None):
+        self.client = AsyncClient(raise_request_exception=False)
+        if username is not None:
+            self.client.force_login(
+                get_user_model().objects.get(username=username))
+
+    async def send(self, method, path, data):
+        if method == 'POST':
+            response = await self.client.post(path, data)
+        else:
+            response = await self.client.get(path)
+        return response.status_code
+
+    def close(self):
+        connections.close_all()
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """Запросы на запущенный сервер; вход через обычную форму."""
+
+    def __init__(self, base_url, username=None, password=None, timeout=30):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(
+            HTTPCookieProcessor(self.cookies), _NoRedirect)
+        if username is not None:
+            status = self.send('POST', resolve_url(settings.LOGIN_URL), {
+                'username': username, 'password': password})
+            if status != 302:
+                raise ValueError(f'{username} не смог войти: {status}.')
+
+    def csrf_token(self, path):
+        token = self._cookie(settings.CSRF_COOKIE_NAME)
+        if token is None:
+            self.send('GET', path, None)
+            token = self._cookie(settings.CSRF_COOKIE_NAME)
+        return token
+
+    def _cookie(self, name):
+        for cookie in self.cookies:
+            if cookie.name == name:
+                return cookie.value
+        return None
+
+    def send(self, method, path, data):
+        url = urljoin(self.base_url, path)
+        body = None
+        headers = {}
+        if method == 'POST':
+            token = self.csrf_token(path)
+            body = urlencode({**data, 'csrfmiddlewaretoken': token}).encode()
+            headers = {'X-CSRFToken': token, 'Referer': url}
+        request = Request(url, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except HTTPError as error:
+            error.read()
+            return error.code
+
+    def close(self):
+        pass
+
+
+class LoadRun:
+    """Прогон нагрузки пулом потоков.
+
+    ``concurrency`` потоков работают, пока не отправлено ``requests``
+    запросов или не истекло ``duration`` секунд. У каждого потока своё
+    зерно, так что последовательность сценариев воспроизводима.
+    """
+
+    def __init__(self, targets, make_transport, mix=None, usernames=(),
+                 auth_ratio=0.0, concurrency=4, requests=None, duration=None,
+                 seed=0):
+        self.targets = targets
+        self.make_transport = make_transport
+        self.mix = mix or DEFAULT_MIX
+        self.usernames = list(usernames)
+        self.auth_ratio = auth_ratio if self.usernames else 0.0
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.seed = seed
+        self.routes = [
+            route for route in self.mix
+            if targets.supports(route)
+            and (self.usernames or route not in AUTH_ONLY)
+        ]
+        if not self.routes:
+            raise ValueError('В смеси не осталось выполнимых сценариев.')
+        self.weights = [self.mix[route] for route in self.routes]
+        self.samples = []
+        self.errors = []
+        self._lock = threading.Lock()
+        self._issued = 0
+
+    def _next_ticket(self, deadline):
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        with self._lock:
+            if self.requests is not None and self._issued >= self.requests:
+                return False
+            self._issued += 1
+            return True
+
+    def _choose(self, rng):
+        route = rng.choices(self.routes, weights=self.weights)[0]
+        authenticated = (
+            route in AUTH_ONLY or rng.random() < self.auth_ratio)
+        return route, authenticated
+
+    def _open_transports(self, index, transports):
+        transports[False] = self.make_transport(None)
+        if self.usernames:
+            username = self.usernames[index % len(self.usernames)]
+            transports[True] = self.make_transport(username)
+
+    def _finish(self, transports, samples):
+        for transport in transports.values():
+            transport.close()
+        with self._lock:
+            self.samples.extend(samples)
+
+    def _worker(self, index, deadline):
+        rng = random.Random(f'{self.seed}:{index}')
+        transports = {}
+        samples = []
+        try:
+            self._open_transports(index, transports)
+            while self._next_ticket(deadline):
+                route, authenticated = self._choose(rng)
+                method, path, data = self.targets.request(route, rng)
+                started = time.perf_counter()
+                status = transports[authenticated].send(method, path, data)
+                samples.append((
+                    route, authenticated, status,
+                    time.perf_counter() - started))
+        except Exception as error:
+            with self._lock:
+                self.errors.append(f'поток {index}: {error!r}')
+        finally:
+            self._finish(transports, samples)
+
+    def run(self):
+        deadline = (
+            time.perf_counter() + self.duration if self.duration else None)
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._worker, args=(index, deadline))
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(self.samples, time.perf_counter() - started)
+
+
+class AsyncLoadRun(LoadRun):
+    """Прогон нагрузки задачами asyncio в одном цикле событий.
+
+    ``concurrency`` задач отправляют запросы через транспорт с
+    асинхронным ``send`` (``AsyncInProcessTransport``). Транспорты с
+    входом пользователей создаются до запуска цикла: ``force_login``
+    обращается к базе синхронно.
+    """
+
+    async def _task(self, index, deadline, transports):
+        rng = random.Random(f'{self.seed}:{index}')
+        samples = []
+        try:
+            while self._next_ticket(deadline):
+                route, authenticated = self._choose(rng)
+                method, path, data = self.targets.request(route, rng)
+                started = time.perf_counter()
+                status = await transports[authenticated].send(
+                    method, path, data)
+                samples.append((
+                    route, authenticated, status,
+                    time.perf_counter() - started))
+        except Exception as error:
+            self.errors.append(f'задача {index}: {error!r}')
+        return samples
+
+    async def _gather(self, deadline, pools):
+        return await asyncio.gather(*(
+            self._task(index, deadline, transports)
+            for index, transports in enumerate(pools)
+        ))
+
+    def run(self):
+        pools = []
+        try:
+            for index in range(self.concurrency):
+                pools.append({})
+                self._open_transports(index, pools[-1])
+            deadline = (
+                time.perf_counter() + self.duration if self.duration
+                else None)
+            started = time.perf_counter()
+            results = asyncio.run(self._gather(deadline, pools))
+            elapsed = time.perf_counter() - started
+        except Exception as error:
+            self.errors.append(f'подготовка: {error!r}')
+            results, elapsed = [], 0.0
+        for transports in pools:
+            self._finish(transports, [])
+        for samples in results:
+            self.samples.extend(samples)
+        return summarize(self.samples, elapsed)
+
+
+def _latency(values):
+    values = sorted(values)
+    return {
+        f'p{percent}_ms': round(_percentile(values, percent) * 1000, 2)
+        for percent in PERCENTILES
+    }
+
+
+def summarize(samples, elapsed):
+    """Запросы в секунду и перцентили задержки по маршрутам и в целом.
+
+    Ошибкой считается ответ со статусом 400 и выше, в том числе 500 от
+    упавшего view при любом транспорте; перенаправления (например, после
+    добавления комментария) — нормальный ответ.
+    """
+    grouped = defaultdict(list)
+    for route, authenticated, status, latency in samples:
+        client = 'auth' if authenticated else 'anon'
+        grouped[f'{route} [{client}]'].append((status, latency))
+    routes = {}
+    for key in sorted(grouped):
+        results = grouped[key]
+        routes[key] = {
+            'requests': len(results),
+            'errors': sum(1 for status, _ in results if status >= 400),
+            'rps': round(len(results) / elapsed, 2),
+            **_latency([latency for _, latency in results]),
+        }
+    total = {
+        'requests': len(samples),
+        'errors': sum(route['errors'] for route in routes.values()),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+        'elapsed_s': round(elapsed, 3),
+    }
+    if samples:
+        total.update(_latency([sample[3] for sample in samples]))
+    return {'routes': routes, 'total': total}
+
+
+def current_commit():
+    """Коммит рабочей копии для сравнения отчётов; ``None`` вне git."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
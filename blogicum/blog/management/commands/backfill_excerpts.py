@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы постов для карточек ленты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов обновлять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='rebuild',
+            help='Пересобрать все анонсы, а не только пустые.',
+        )
+
+    def handle(self, *args, batch_size, rebuild, **options):
+        posts = Post.objects.order_by('pk').only('pk', 'text')
+        if not rebuild:
+            posts = posts.filter(excerpt='')
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                post.excerpt = make_excerpt(post.text)
+            with transaction.atomic():
+                Post.objects.bulk_update(batch, ['excerpt'])
+            updated += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено анонсов: {updated}.'))
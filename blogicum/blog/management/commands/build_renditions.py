@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+from blog.renditions import refresh_post_renditions
+
+
+class Command(BaseCommand):
+    help = 'Готовит уменьшенные копии изображений существующих постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько постов читать из базы за один запрос.',
+        )
+        parser.add_argument(
+            '--all', action='store_true', dest='rebuild',
+            help='Пересобрать копии даже для уже обработанных изображений.',
+        )
+
+    def handle(self, *args, batch_size, rebuild, **options):
+        posts = (
+            Post.objects.exclude(image='')
+            .order_by('pk')
+            .only('pk', 'image', 'renditions')
+        )
+        last_pk = 0
+        built = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                if rebuild:
+                    post.renditions = {**post.renditions, 'source': None}
+                renditions = refresh_post_renditions(post)
+                if renditions is None:
+                    continue
+                Post.objects.filter(pk=post.pk).update(
+                    renditions=renditions, updated_at=timezone.now())
+                built += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Подготовлены копии для постов: {built}.'))
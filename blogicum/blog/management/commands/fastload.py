@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.fastload import FixtureError, load
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает фикстуру или дамп блога (JSON, JSONL, gzip) '
+        'пачками через bulk_create, без сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл фикстуры или дампа.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько строк вставлять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--drop-indexes', action='store_true',
+            help='Снять индексы на время загрузки и построить заново.',
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, первичный ключ которых уже занят.',
+        )
+
+    def progress(self, label, rows):
+        if self.verbosity > 1:
+            self.stdout.write(f'{label}: {rows}')
+
+    def handle(self, *args, path, batch_size, drop_indexes, ignore_conflicts,
+               **options):
+        self.verbosity = options['verbosity']
+        started = time.perf_counter()
+        try:
+            stats, skipped = load(
+                path, batch_size=batch_size, drop_indexes=drop_indexes,
+                ignore_conflicts=ignore_conflicts, progress=self.progress,
+            )
+        except (OSError, FixtureError) as error:
+            raise CommandError(f'Не удалось загрузить {path}: {error}')
+        elapsed = time.perf_counter() - started
+        for label, (rows, seconds) in stats.items():
+            self.stdout.write(
+                f'{label}: {rows} строк за {seconds:.2f} с '
+                f'({rows / max(seconds, 1e-6):.0f} строк/с)')
+        for label, count in sorted(skipped.items()):
+            self.stdout.write(f'{label}: пропущено {count} записей')
+        total = sum(rows for rows, _ in stats.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {total} за {elapsed:.2f} с '
+            f'({total / max(elapsed, 1e-6):.0f} строк/с).'))
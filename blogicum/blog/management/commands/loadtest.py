@@ -0,0 +1,210 @@
+import json
+from functools import partial
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from blog.loadtest import (DEFAULT_MIX, AsyncInProcessTransport,
+                           AsyncLoadRun, HttpTransport, InProcessTransport,
+                           LoadRun, Targets, current_commit, ensure_users,
+                           parse_mix)
+
+COLUMNS = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms')
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон страниц блога: запросы в секунду и перцентили '
+        'задержки по маршрутам. Сценарий blog:add_comment создаёт '
+        'комментарии — запускайте на тестовой базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес запущенного сервера, например http://127.0.0.1:8000;'
+                 ' без него запросы идут в приложение в этом процессе.',
+        )
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help='Без --url: слать запросы в ASGI-обработчик задачами '
+                 'asyncio вместо WSGI-обработчика пулом потоков.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Сколько потоков (задач asyncio с --asgi) отправляют '
+                 'запросы одновременно.',
+        )
+        parser.add_argument(
+            '--requests', type=int,
+            help='Сколько запросов отправить всего (по умолчанию 500).',
+        )
+        parser.add_argument(
+            '--duration', type=float,
+            help='Сколько секунд длится прогон вместо числа запросов.',
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=20,
+            help='Сколько запросов сделать до замера.',
+        )
+        parser.add_argument(
+            '--mix', type=parse_mix,
+            help='Веса сценариев: '
+                 + ','.join(f'{key}={value}'
+                            for key, value in DEFAULT_MIX.items()),
+        )
+        parser.add_argument(
+            '--auth-ratio', type=float, default=0.3,
+            help='Доля запросов к страницам от вошедших пользователей.',
+        )
+        parser.add_argument(
+            '--users', type=int,
+            help='Сколько пользователей для входа; по умолчанию по одному '
+                 'на поток, 0 — только анонимные сценарии.',
+        )
+        parser.add_argument(
+            '--password', default='loadtest-password',
+            help='Пароль пользователей нагрузочного теста.',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно выбора сценариев и адресов.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить отчёт в JSON-файл.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON-отчёт прошлого прогона для сравнения.',
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести отчёт в JSON.',
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1:
+            raise CommandError('--concurrency должен быть больше нуля.')
+        if options['requests'] is None and options['duration'] is None:
+            options['requests'] = 500
+        try:
+            targets = Targets()
+        except ValueError as error:
+            raise CommandError(error)
+        users = options['users']
+        if users is None:
+            users = options['concurrency']
+        usernames = ensure_users(users, options['password']) if users else []
+        report = self.load(targets, usernames, options)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, ensure_ascii=False, indent=2)
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as fh:
+                baseline = json.load(fh)
+        self.print_table(report, baseline)
+
+    def load(self, targets, usernames, options):
+        if options['url'] and options['asgi']:
+            raise CommandError('--asgi работает только без --url.')
+        if options['url']:
+            make_transport = partial(
+                self.http_transport, options['url'], options['password'])
+            return self.run(
+                targets, LoadRun, make_transport, usernames, options)
+        run_class, transport = (
+            (AsyncLoadRun, AsyncInProcessTransport) if options['asgi']
+            else (LoadRun, InProcessTransport))
+        with override_settings(**self.in_process_settings()):
+            return self.run(
+                targets, run_class, transport, usernames, options)
+
+    @staticmethod
+    def in_process_settings():
+        overrides = {
+            # Тестовый клиент ходит с хостом testserver.
+            'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+            # Панель отладки на каждой странице исказила бы замер.
+            'INTERNAL_IPS': [],
+        }
+        storage = import_string(settings.STATICFILES_STORAGE)
+        if (issubclass(storage, ManifestStaticFilesStorage)
+                and not storage().exists(storage.manifest_name)):
+            # Без collectstatic манифеста нет, и {% static %} упадёт.
+            overrides['STATICFILES_STORAGE'] = (
+                'django.contrib.staticfiles.storage.StaticFilesStorage')
+        return overrides
+
+    @staticmethod
+    def http_transport(url, password, username):
+        return HttpTransport(url, username, password)
+
+    def run(self, targets, run_class, make_transport, usernames, options):
+        common = {
+            'mix': options['mix'], 'usernames': usernames,
+            'auth_ratio': options['auth_ratio'],
+            'concurrency': options['concurrency'], 'seed': options['seed'],
+        }
+        try:
+            if options['warmup']:
+                run_class(targets, make_transport,
+                          requests=options['warmup'], **common).run()
+            load_run = run_class(
+                targets, make_transport, requests=options['requests'],
+                duration=options['duration'], **common)
+            report = load_run.run()
+        except ValueError as error:
+            raise CommandError(error)
+        if load_run.errors:
+            raise CommandError(
+                'Прогон прерван:\n' + '\n'.join(load_run.errors))
+        report['meta'] = {
+            'commit': current_commit(),
+            'started_at': timezone.now().isoformat(),
+            'target': options['url'] or 'in-process',
+            'interface': 'asgi' if options['asgi'] else 'wsgi',
+            'concurrency': options['concurrency'],
+            'mix': load_run.mix,
+            'auth_ratio': options['auth_ratio'],
+        }
+        return report
+
+    def print_table(self, report, baseline):
+        previous = (baseline or {}).get('routes', {})
+        header = f"{'маршрут':<34}" + ''.join(
+            f'{name:>10}' for name in COLUMNS)
+        if baseline:
+            header += f"{'Δ rps':>10}{'Δ p95':>10}"
+        self.stdout.write(header)
+        rows = [*report['routes'].items(), ('всего', report['total'])]
+        for name, values in rows:
+            line = f'{name:<34}' + ''.join(
+                f'{values.get(column, 0):>10}' for column in COLUMNS)
+            before = (
+                baseline.get('total') if name == 'всего'
+                else previous.get(name)) if baseline else None
+            if before:
+                line += ''.join(
+                    f'{self.change(before.get(key), values.get(key)):>10}'
+                    for key in ('rps', 'p95_ms'))
+            self.stdout.write(line)
+        commit = report['meta']['commit']
+        self.stdout.write(
+            f"{report['total']['elapsed_s']} с, "
+            f"{report['meta']['concurrency']} потоков"
+            + (f', коммит {commit}' if commit else ''))
+
+    @staticmethod
+    def change(before, after):
+        if not before or after is None:
+            return '—'
+        return f'{(after - before) / before * 100:+.1f}%'
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.tasks import repair_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованный счётчик комментариев постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов проверять за одну транзакцию.',
+        )
+        parser.add_argument(
+            '--post', type=int, nargs='*', dest='post_ids',
+            help='Пересчитать только посты с указанными id.',
+        )
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Не считать сразу, а поставить пачки в очередь задач.',
+        )
+
+    def handle(self, *args, batch_size, post_ids, enqueue, **options):
+        posts = Post.objects.order_by('pk')
+        if post_ids:
+            posts = posts.filter(pk__in=post_ids)
+        last_pk = 0
+        checked = repaired = batches = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            checked += len(batch)
+            batches += 1
+            if enqueue:
+                repair_comment_counts.enqueue(batch)
+                continue
+            with transaction.atomic():
+                repaired += Post.objects.filter(
+                    pk__in=batch).repair_comment_counts()
+        if enqueue:
+            self.stdout.write(self.style.SUCCESS(
+                f'Поставлено в очередь пачек: {batches} ({checked} постов).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Проверено постов: {checked}, исправлено: {repaired}.'))
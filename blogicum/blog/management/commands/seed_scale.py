@@ -0,0 +1,61 @@
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.seeding import Seeder, SeedOptions
+
+HELP = {
+    'users': 'Сколько пользователей создать.',
+    'categories': 'Сколько категорий создать.',
+    'locations': 'Сколько местоположений создать.',
+    'posts': 'Сколько постов создать.',
+    'comments': 'Сколько комментариев создать (примерно).',
+    'seed': 'Зерно генератора: одинаковое зерно даёт одинаковые данные.',
+    'skew': 'Перекос авторов и категорий: 1 — равномерно, больше — '
+            'сильнее.',
+    'days': 'За сколько дней в прошлом распределить публикации.',
+    'future_ratio': 'Доля отложенных постов с датой в будущем.',
+    'unpublished_ratio': 'Доля снятых с публикации постов.',
+    'images': 'Сколько заглушек изображений создать; 0 — без картинок.',
+    'image_ratio': 'Доля постов с изображением.',
+    'batch_size': 'Сколько строк вставлять за одну транзакцию.',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими данными заданного объёма для '
+        'замеров производительности, например: --users 100000 '
+        '--posts 5000000 --comments 50000000.'
+    )
+
+    def add_arguments(self, parser):
+        for field in fields(SeedOptions):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}", type=field.type,
+                default=field.default, help=HELP[field.name],
+            )
+
+    def progress(self, label, rows):
+        if self.verbosity > 1:
+            self.stdout.write(f'{label}: {rows}')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        seed_options = SeedOptions(**{
+            field.name: options[field.name] for field in fields(SeedOptions)
+        })
+        if seed_options.posts and not seed_options.users:
+            raise CommandError('Постам нужны авторы: задайте --users.')
+        if seed_options.batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        stats = Seeder(seed_options, progress=self.progress).run()
+        total_rows = total_seconds = 0
+        for label, (rows, seconds) in stats.items():
+            total_rows += rows
+            total_seconds += seconds
+            self.stdout.write(
+                f'{label}: {rows} строк за {seconds:.2f} с '
+                f'({rows / max(seconds, 1e-6):.0f} строк/с)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total_rows} за {total_seconds:.2f} с.'))
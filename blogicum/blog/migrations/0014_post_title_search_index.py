@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Поиск в админке идёт по UPPER(title) LIKE '%...%': B-tree тут бесполезен,
+# а триграммный GIN-индекс PostgreSQL такой LIKE ускоряет. В SQLite
+# подходящих индексов нет, поэтому миграция там ничего не делает.
+CREATE = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS post_title_trgm_idx ON blog_post '
+    'USING gin (UPPER(title::text) gin_trgm_ops)',
+]
+DROP = ['DROP INDEX IF EXISTS post_title_trgm_idx']
+
+
+def run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgresql(CREATE), run_on_postgresql(DROP)),
+    ]
@@ -1,11 +1,42 @@
+from contextlib import contextmanager
+from threading import local
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import Truncator
 
-from .constants import (MAX_STR_LENGHT, MAX_STR_LENGTH_CATEGORY,
-                        MAX_STR_LENGTH_POST)
+from .constants import (EXCERPT_WORDS, MAX_STR_LENGHT,
+                        MAX_STR_LENGTH_CATEGORY, MAX_STR_LENGTH_POST)
 
 User = get_user_model()
 
+# Посты, которые удаляются прямо сейчас в этом потоке. Их комментарии
+# уходят каскадом, и пересчитывать для каждого счётчик и кеш незачем.
+_deleting = local()
+
+
+def deleting_post_ids():
+    if not hasattr(_deleting, 'post_ids'):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+@contextmanager
+def deleting_posts(post_ids):
+    """Помечает посты удаляемыми на время блока.
+
+    Пометка снимается в ``finally``, поэтому не переживает удаление, даже
+    если оно упало или откатилось.
+    """
+    marked = set(post_ids) - deleting_post_ids()
+    deleting_post_ids().update(marked)
+    try:
+        yield
+    finally:
+        deleting_post_ids().difference_update(marked)
+
 
 class PublishedModel(models.Model):
     is_published = models.BooleanField(
@@ -57,10 +88,86 @@ class Location(PublishedModel):
         return self.name
 
 
+def published_q():
+    """Условие публикации поста для ``filter()`` и составных условий."""
+    return models.Q(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=timezone.now(),
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        """Посты, которые видны всем читателям."""
+        return self.filter(published_q())
+
+    def visible_to(self, user):
+        """Опубликованные посты и все посты самого пользователя."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(published_q() | models.Q(author=user))
+
+    def with_relations(self):
+        """Автор, место и категория одним запросом с JOIN."""
+        return self.select_related('author', 'location', 'category')
+
+    def with_comment_count(self):
+        """Число комментариев для карточек ленты.
+
+        Счётчик денормализован в ``Post.comment_count``, поэтому ни JOIN,
+        ни GROUP BY по комментариям не нужны; метод оставлен точкой
+        расширения цепочки, чтобы ленты не зависели от способа подсчёта.
+        """
+        return self.all()
+
+    def for_feed(self):
+        """Без полного текста: карточкам ленты хватает ``excerpt``."""
+        return self.defer('text')
+
+    def delete(self):
+        with deleting_posts(self.values_list('pk', flat=True)):
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def repair_comment_counts(self):
+        """Сверяет ``comment_count`` с комментариями и чинит расхождения.
+
+        Возвращает число исправленных постов.
+        """
+        actual = Coalesce(
+            models.Subquery(
+                Comment.objects.filter(post=models.OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(total=models.Count('pk'))
+                .values('total')
+            ),
+            0,
+        )
+        drifted = list(
+            self.annotate(actual=actual)
+            .filter(~models.Q(comment_count=models.F('actual')))
+            .values_list('pk', flat=True)
+        )
+        if not drifted:
+            return 0
+        return self.model.objects.filter(pk__in=drifted).update(
+            comment_count=actual)
+
+
+def make_excerpt(text):
+    # Совпадает с выводом фильтра truncatewords, который был в карточке.
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
 class Post(PublishedModel, TitleModel):
     title = models.CharField(
         max_length=MAX_STR_LENGTH_POST, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='''Если установить дату и время в будущем,
@@ -85,14 +192,65 @@ class Post(PublishedModel, TitleModel):
         verbose_name='Категория'
     )
     image = models.ImageField(upload_to='post_images/', blank=True)
+    renditions = models.JSONField(
+        'Копии изображения', default=dict, blank=True, editable=False)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = [
+            models.Index(
+                fields=['pub_date'],
+                name='post_published_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['category', 'pub_date'],
+                name='post_category_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_feed_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        update_fields = kwargs.get('update_fields')
+        if 'text' not in deferred:
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        # Счётчик меняется только атомарными UPDATE из сигналов, поэтому
+        # при сохранении уже существующего поста его не перезаписываем:
+        # иначе устаревший экземпляр затрёт актуальное значение.
+        if (not self._state.adding and self.pk is not None
+                and not kwargs.get('force_insert')
+                and update_fields is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'comment_count'
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with deleting_posts([self.pk]):
+            return super().delete(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
@@ -101,3 +259,11 @@ class Comment(models.Model):
                                verbose_name='Автор публикации')
     text = models.TextField('Текст комментария', null=False)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
+        ]
@@ -0,0 +1,218 @@
+import hashlib
+import time
+from calendar import timegm
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+GENERATION_KEY = 'blog:gen:{scope}'
+BUMPED_KEY = 'blog:bumped:{scope}'
+PAGE_KEY = 'blog:page:{digest}'
+FEED_STATE_KEY = 'blog:feed:{digest}'
+
+# Области, от которых зависит любая страница: справочники и пользователи.
+GLOBAL_SCOPE = 'all'
+
+
+def page_cache_timeout():
+    return getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 0)
+
+
+def bump(*scopes):
+    """Сдвигает поколение областей: их старые ключи больше не читаются.
+
+    Поколение — не счётчик, а новое значение времени: ``incr`` у
+    файлового кеша не атомарен, и два процесса, сдвинувшие область
+    одновременно, записали бы одно и то же число. Новое значение в любом
+    случае отличается от прежнего, кто бы из процессов ни записал
+    последним. Заодно запоминается время сдвига: по нему ленты строят
+    Last-Modified, который иначе не заметил бы снятого с публикации или
+    удалённого поста.
+    """
+    generation = time.time_ns()
+    now = time.time()
+    values = {}
+    for scope in scopes:
+        values[GENERATION_KEY.format(scope=scope)] = generation
+        values[BUMPED_KEY.format(scope=scope)] = now
+    cache.set_many(values, None)
+
+
+def generations(scopes):
+    """Текущие поколения областей.
+
+    Пропавшее из кеша поколение (вытеснено или кеш перезапущен) заводится
+    заново новым значением, а не нулём: иначе снова читались бы страницы,
+    сохранённые до первого сдвига.
+    """
+    keys = [GENERATION_KEY.format(scope=scope) for scope in scopes]
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        generation = time.time_ns()
+        for key in missing:
+            cache.add(key, generation, None)
+        values.update(cache.get_many(missing))
+    return [values.get(key, 0) for key in keys]
+
+
+def last_bumped(scopes):
+    """Время последнего сдвига поколения любой из областей (Unix time).
+
+    Если отметки нет (кеш очищен или перезапущен), ею становится текущий
+    момент: Last-Modified один раз сдвинется вперёд, но не останется в
+    прошлом, пропустив изменение.
+    """
+    keys = [BUMPED_KEY.format(scope=scope) for scope in scopes]
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, None)
+        values.update(cache.get_many(missing))
+    return max(values.values(), default=None)
+
+
+def page_cache_key(request, scopes, timeout):
+    # Интервал времени входит в ключ: отложенные посты появятся не позже,
+    # чем через timeout секунд после наступления pub_date.
+    bucket = int(time.time() // timeout)
+    raw = '|'.join([
+        request.method,
+        request.get_full_path(),
+        ','.join(scopes),
+        ','.join(map(str, generations(scopes))),
+        str(bucket),
+    ])
+    return PAGE_KEY.format(digest=hashlib.md5(raw.encode()).hexdigest())
+
+
+def cached_feed_state(request, scopes, compute):
+    """Состояние ленты для валидаторов из кеша или из ``compute()``.
+
+    Состояние не зависит от номера страницы, поэтому ключ — путь без
+    параметров, пользователь (автор видит в профиле и снятые посты) и
+    поколения областей. Без ``BLOG_FEED_STATE_TIMEOUT`` кеш не
+    используется; с ним отложенный пост попадёт в состояние не позже,
+    чем через этот таймаут.
+    """
+    timeout = getattr(settings, 'BLOG_FEED_STATE_TIMEOUT', 0)
+    if not timeout:
+        return compute()
+    raw = '|'.join(map(str, [
+        request.path, request.user.pk, ','.join(scopes),
+        *generations(scopes),
+    ]))
+    key = FEED_STATE_KEY.format(digest=hashlib.md5(raw.encode()).hexdigest())
+    state = cache.get(key)
+    if state is None:
+        state = compute()
+        cache.set(key, state, timeout)
+    return state
+
+
+class AnonymousPageCacheMixin:
+    """Кеширует отрендеренную страницу целиком для анонимных читателей.
+
+    Наследник перечисляет в ``get_page_cache_scopes`` области данных, от
+    которых зависит страница; сигналы ``blog.signals`` сдвигают поколения
+    этих областей при изменении постов, комментариев и справочников.
+    """
+
+    def get_page_cache_scopes(self):
+        raise NotImplementedError(
+            'Переопределите get_page_cache_scopes() в наследнике.')
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = page_cache_timeout()
+        if (not timeout or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+
+        scopes = [GLOBAL_SCOPE, *self.get_page_cache_scopes()]
+        key = page_cache_key(request, scopes, timeout)
+        response = cache.get(key)
+        if response is not None:
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified')),
+                response=response,
+            )
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            if getattr(response, 'is_rendered', True):
+                cache.set(key, response, timeout)
+            else:
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(key, rendered, timeout))
+        return response
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для GET-запросов; 304, если страница та же.
+
+    Наследник возвращает из ``get_validator_state()`` время последнего
+    изменения и значения, от которых зависит страница, не рендеря её.
+    В ETag также входят адрес с параметрами, пользователь, его CSRF-токен
+    и поколения областей кеша из ``get_page_cache_scopes()``, поэтому ETag
+    меняется и при правке комментариев или справочников. Last-Modified
+    этого не видит и служит подсказкой для клиентов без ETag.
+    """
+
+    def get_validator_state(self):
+        raise NotImplementedError(
+            'Переопределите get_validator_state() в наследнике.')
+
+    def get_validators(self):
+        last_modified, state = self.get_validator_state()
+        scopes = [GLOBAL_SCOPE, *self.get_page_cache_scopes()]
+        raw = '|'.join(map(str, [
+            self.request.get_full_path(),
+            self.request.user.pk,
+            self.request.META.get('CSRF_COOKIE', ''),
+            *state,
+            *generations(scopes),
+        ]))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        return etag, last_modified
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.setdefault('Last-Modified', http_date(last_modified))
+        return response
+
+
+class PostCardCacheMixin:
+    """Параметры кеширования фрагментов ``includes/post_card.html``.
+
+    Ключ карточки складывается в шаблоне из id поста, ``updated_at``,
+    числа комментариев и имени автора; ``card_version`` добавляет
+    поколение справочников, так как карточка выводит название категории
+    и места. Карточки хранятся в том же кеше ``default``, что и
+    поколения: в prod он общий для всех процессов, и сдвиг поколения в
+    одном из них сразу сбрасывает карточки в остальных, не дожидаясь
+    ``BLOG_CARD_CACHE_TIMEOUT``.
+    """
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['card_cache_timeout'] = getattr(
+            settings, 'BLOG_CARD_CACHE_TIMEOUT', 0)
+        context['card_version'] = generations([GLOBAL_SCOPE])[0]
+        return context
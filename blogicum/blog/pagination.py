@@ -0,0 +1,262 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+COUNT_KEY = 'blog:count:{digest}'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _key_to_json(value):
+    # isoformat() без усечения микросекунд: ключ должен совпадать точно.
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в курсор')
+
+
+class CursorPage:
+    """Страница ленты, полученная поиском по ключу, а не через OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по упорядоченному набору уникальных полей.
+
+    Каждая страница выбирается условием «строго после ключа последней
+    записи», поэтому время ответа не зависит от глубины страницы, а
+    ``COUNT(*)`` не выполняется вовсе. Последнее поле ``ordering`` должно
+    быть уникальным (обычно ``pk``), все поля сортируются в одном
+    направлении.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-pk')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.descending = self.ordering[0].startswith('-')
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        backwards = False
+        if cursor:
+            values, backwards = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(values, backwards))
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            )
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        if not rows:
+            return CursorPage(rows)
+        return CursorPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if has_next else None),
+            previous_cursor=(
+                self.encode_cursor(rows[0], backwards=True)
+                if has_previous else None),
+        )
+
+    def encode_cursor(self, obj, backwards=False):
+        values = [getattr(obj, name) for name in self.fields]
+        payload = json.dumps(
+            {'v': values, 'b': backwards},
+            default=_key_to_json,
+            separators=(',', ':'),
+        )
+        token = base64.urlsafe_b64encode(payload.encode())
+        return token.decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded))
+            values = payload['v']
+            backwards = bool(payload['b'])
+            if len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            opts = self.queryset.model._meta
+            values = [
+                (opts.pk if name == 'pk' else opts.get_field(name))
+                .to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError,
+                ValidationError) as error:
+            raise InvalidCursor(cursor) from error
+        return values, backwards
+
+    def _seek(self, values, backwards):
+        lookup = 'lt' if self.descending != backwards else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for prev_name, prev_value in zip(self.fields, values[:index]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+
+def _bucket(value, timeout):
+    # SQLite получает дату-время уже строкой.
+    moment = value
+    if isinstance(value, str):
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            moment = None
+    if not isinstance(moment, datetime):
+        return value
+    return int(moment.replace(tzinfo=timezone.utc).timestamp() // timeout)
+
+
+def _count_cache_key(queryset, timeout):
+    sql, params = queryset.query.sql_with_params()
+    # «Сейчас» из published() меняется каждый запрос: округляем его до
+    # интервала кеша, чтобы один и тот же набор строк попадал в один ключ.
+    params = [_bucket(value, timeout) for value in params]
+    raw = f'{queryset.db}|{sql}|{params!r}'
+    return COUNT_KEY.format(digest=hashlib.md5(raw.encode()).hexdigest())
+
+
+def _estimate(queryset, compute=True):
+    # Оценка и признак того, что это только что посчитанное точное число.
+    # С compute=False запросов нет вовсе: годится только кеш.
+    queryset = queryset.order_by()
+    if connections[queryset.db].vendor == 'postgresql':
+        if not compute:
+            return None, False
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows']), False
+    timeout = getattr(settings, 'BLOG_COUNT_CACHE_TIMEOUT', 0)
+    if not timeout:
+        return None, False
+    key = _count_cache_key(queryset, timeout)
+    count = cache.get(key)
+    if count is not None or not compute:
+        return count, False
+    count = queryset.count()
+    cache.set(key, count, timeout)
+    return count, True
+
+
+def estimate_count(queryset):
+    """Дешёвая оценка числа строк или ``None``, если оценить нечем.
+
+    PostgreSQL отдаёт оценку планировщика из ``EXPLAIN`` без чтения
+    таблицы. Для остальных баз точный ``COUNT(*)`` выполняется раз в
+    ``BLOG_COUNT_CACHE_TIMEOUT`` секунд и хранится в кеше.
+    """
+    return _estimate(queryset)[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который не считает большие наборы строк точно.
+
+    Если в кеше нет числа не меньше ``BLOG_ESTIMATED_COUNT_THRESHOLD``,
+    сначала выполняется дешёвый ``COUNT(*)`` с ``LIMIT`` по этому порогу:
+    если строк меньше, он и есть точное число. Для больших наборов число
+    страниц считается по оценке, а границы страницы проверяются по
+    строкам, которые реально выбраны: заниженная оценка не превращает
+    существующую страницу в 404.
+    """
+
+    _count_is_exact = True
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+        threshold = getattr(
+            settings, 'BLOG_ESTIMATED_COUNT_THRESHOLD', 10_000)
+        estimate, exact = _estimate(queryset, compute=False)
+        if estimate is None or estimate < threshold:
+            probe = queryset.order_by()[:threshold].count()
+            if probe < threshold:
+                return probe
+            estimate, exact = _estimate(queryset)
+        if estimate is None:
+            return queryset.count()
+        self._count_is_exact = exact
+        # Строк заведомо не меньше порога, что бы ни думал планировщик.
+        return max(estimate, threshold)
+
+    def page(self, number):
+        if self._count_is_exact:
+            return super().page(number)
+        try:
+            number = self.validate_number(number)
+        except EmptyPage:
+            # Оценка могла оказаться меньше реального числа строк: решает
+            # сама страница.
+            number = int(number)
+            if number < 1:
+                raise
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page + self.orphans
+        # Одна лишняя строка показывает, есть ли что-то после страницы.
+        rows = list(self.object_list[bottom:top + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        if len(rows) > top - bottom:
+            self._clamp(max(self.count, bottom + len(rows)))
+            rows = rows[:self.per_page]
+        else:
+            self._clamp(bottom + len(rows))
+        return self._get_page(rows, number, self)
+
+    def _clamp(self, count):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
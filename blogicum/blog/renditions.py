@@ -0,0 +1,127 @@
+"""Уменьшенные копии изображений постов для карточек и страницы поста."""
+import logging
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Ширина карточки 40rem: 640px для обычных экранов и вдвое больше для
+# экранов высокой плотности.
+RENDITIONS = {
+    'card': 640,
+    'detail': 960,
+    'retina': 1280,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 85
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    options = {'optimize': True}
+    if image_format == 'JPEG':
+        options['quality'] = JPEG_QUALITY
+        options['progressive'] = True
+    elif image_format == 'WEBP':
+        options = {'quality': WEBP_QUALITY, 'method': 6}
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def build_renditions(image_field):
+    """Сохраняет уменьшенные копии рядом с оригиналом.
+
+    Возвращает описание для ``Post.renditions``: имя исходного файла и для
+    каждого варианта его размеры и имена файлов в хранилище.
+    """
+    storage = image_field.storage
+    with image_field.open('rb'):
+        source = Image.open(image_field)
+        source = ImageOps.exif_transpose(source)
+        source.load()
+    has_alpha = source.mode in ('RGBA', 'LA', 'P')
+    fallback_format, fallback_ext = (
+        ('PNG', 'png') if has_alpha else ('JPEG', 'jpg'))
+    if not has_alpha:
+        source = source.convert('RGB')
+
+    stem = PurePosixPath(image_field.name)
+    stem = str(stem.with_name(stem.stem))
+    variants = {}
+    for name, width in RENDITIONS.items():
+        image = source.copy()
+        image.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        variants[name] = {
+            'width': image.width,
+            'height': image.height,
+            'fallback': storage.save(
+                f'{stem}.{name}.{fallback_ext}',
+                _encode(image, fallback_format)),
+            'webp': storage.save(
+                f'{stem}.{name}.webp', _encode(image, 'WEBP')),
+        }
+    return {'source': image_field.name, 'variants': variants}
+
+
+def _rendition_files(renditions):
+    return {
+        variant[key]
+        for variant in (renditions or {}).get('variants', {}).values()
+        for key in ('fallback', 'webp')
+    }
+
+
+def delete_renditions(renditions, storage, keep=()):
+    for name in _rendition_files(renditions) - set(keep):
+        storage.delete(name)
+
+
+def files_in_use(renditions, exclude_pk=None):
+    """Файлы копий из ``renditions``, на которые ссылаются другие посты.
+
+    Посты из ``seed_data`` делят копии заглушек, поэтому удалять файл
+    можно, только если больше никто на него не ссылается.
+    """
+    names = _rendition_files(renditions)
+    if not names:
+        return set()
+    lookups = Q()
+    for variant in renditions['variants']:
+        for key in ('fallback', 'webp'):
+            lookups |= Q(**{
+                f'renditions__variants__{variant}__{key}__in': names})
+    others = Post.objects.exclude(pk=exclude_pk).filter(lookups)
+    used = set()
+    for other in others.values_list('renditions', flat=True):
+        used |= _rendition_files(other)
+    return used & names
+
+
+def refresh_post_renditions(post):
+    """Пересобирает копии, если изображение поста сменилось.
+
+    Возвращает новое значение ``Post.renditions`` или ``None``, если
+    пересобирать нечего.
+    """
+    current = post.renditions or {}
+    if current.get('source') == (post.image.name or None):
+        return None
+    storage = post.image.storage
+    if current:
+        delete_renditions(
+            current, storage, keep=files_in_use(current, post.pk))
+    if not post.image:
+        return {}
+    try:
+        return build_renditions(post.image)
+    except (OSError, Image.DecompressionBombError) as error:
+        logger.warning(
+            'Не удалось подготовить копии %s: %s', post.image.name, error)
+        # Запоминаем источник, чтобы не повторять попытку при каждом save().
+        return {'source': post.image.name, 'variants': {}}
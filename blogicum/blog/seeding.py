@@ -0,0 +1,273 @@
+"""Синтетические данные промышленного объёма для замеров производительности.
+
+Строки создаются пачками через ``bulk_create`` с явными первичными
+ключами: так не нужно перечитывать только что вставленные id, а в памяти
+держится одна пачка, сколько бы строк ни было всего. Все случайные
+величины берутся из ``random.Random`` с заданным зерном, поэтому на
+пустой базе одинаковые параметры дают одинаковые данные.
+
+Распределения перекошены, как в живом блоге: немногие авторы и
+категории собирают большую часть постов, а немногие посты — большую
+часть комментариев.
+"""
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image
+
+from . import page_cache
+from .fastload import keep_timestamps, reset_sequences
+from .models import Category, Comment, Location, Post, make_excerpt
+from .renditions import build_renditions
+
+WORDS = (
+    'город утро дорога письмо окно поезд река вечер книга друг дом море '
+    'работа история ветер снег лето встреча кофе музыка сад разговор '
+    'мост огонь звезда тишина праздник рынок площадь дождь фонарь'
+).split()
+PLACEHOLDER_COLORS = (
+    (200, 80, 60), (60, 140, 200), (90, 170, 90), (220, 180, 60),
+    (140, 90, 180), (80, 80, 80), (230, 120, 160), (40, 160, 160),
+)
+# Число комментариев поста распределено по Парето; хвост обрезаем, чтобы
+# один пост не забрал заметную долю всех строк.
+MAX_COMMENTS_FACTOR = 50
+PARETO_ALPHA = 1.5
+# Тексты берутся из заранее собранного набора: генерировать каждый
+# заново дольше, чем вставлять строку.
+TEXT_POOL_SIZE = 1024
+
+
+@dataclass
+class SeedOptions:
+    users: int = 1000
+    categories: int = 20
+    locations: int = 50
+    posts: int = 10_000
+    comments: int = 50_000
+    seed: int = 0
+    skew: float = 2.0
+    days: int = 365
+    future_ratio: float = 0.02
+    unpublished_ratio: float = 0.05
+    images: int = 0
+    image_ratio: float = 0.3
+    batch_size: int = 1000
+
+
+def skewed(rng, count, skew):
+    """Индекс от 0 до ``count - 1``; малые индексы выпадают чаще.
+
+    ``skew=1`` даёт равномерное распределение, чем больше — тем сильнее
+    перекос к началу диапазона.
+    """
+    return min(count - 1, int(count * rng.random() ** skew))
+
+
+def sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def paragraph(rng):
+    return '. '.join(
+        sentence(rng, 6, 14).capitalize()
+        for _ in range(rng.randint(1, 12))) + '.'
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Seeder:
+    def __init__(self, options, progress=None):
+        self.options = options
+        self.progress = progress
+        self.now = timezone.now()
+        self.stats = {}
+
+    def rng(self, stream):
+        # Отдельный поток случайных чисел на каждую таблицу: изменение
+        # объёма одной таблицы не сдвигает значения в остальных.
+        return random.Random(f'{self.options.seed}:{stream}')
+
+    def insert(self, model, objects):
+        """Вставляет объекты пачками, каждую в своей транзакции."""
+        label = model._meta.label_lower
+        started = time.perf_counter()
+        rows = 0
+        batch = []
+        with keep_timestamps(model):
+            for obj in objects:
+                batch.append(obj)
+                if len(batch) >= self.options.batch_size:
+                    rows += self._flush(model, batch)
+                    if self.progress is not None:
+                        self.progress(label, rows)
+            rows += self._flush(model, batch)
+        self.stats[label] = (rows, time.perf_counter() - started)
+
+    @staticmethod
+    def _flush(model, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        count = len(batch)
+        batch.clear()
+        return count
+
+    def users(self, first_pk):
+        User = get_user_model()
+        joined_rng = self.rng('users')
+        for pk in range(first_pk, first_pk + self.options.users):
+            yield User(
+                pk=pk, username=f'seed_user_{pk}', password='!',
+                date_joined=self.now - timedelta(
+                    days=joined_rng.uniform(0, self.options.days)),
+            )
+
+    def categories(self, first_pk):
+        rng = self.rng('categories')
+        for pk in range(first_pk, first_pk + self.options.categories):
+            yield Category(
+                pk=pk, title=sentence(rng, 1, 3).capitalize(),
+                description=sentence(rng, 8, 20), slug=f'seed-{pk}',
+                # Каждая десятая категория снята с публикации.
+                is_published=(pk - first_pk) % 10 != 9,
+                created_at=self.now,
+            )
+
+    def locations(self, first_pk):
+        rng = self.rng('locations')
+        for pk in range(first_pk, first_pk + self.options.locations):
+            yield Location(
+                pk=pk, name=sentence(rng, 1, 2).capitalize(),
+                is_published=(pk - first_pk) % 8 != 7,
+                created_at=self.now,
+            )
+
+    def schedule(self):
+        """Дата публикации и число комментариев каждого поста по порядку.
+
+        Вызывается дважды — для постов и для их комментариев — и оба раза
+        даёт одну и ту же последовательность, так что ``comment_count``
+        сходится с комментариями, а комментарии не старше поста.
+        """
+        options = self.options
+        rng = self.rng('schedule')
+        mean = options.comments / max(1, options.posts)
+        scale = mean * (PARETO_ALPHA - 1) / PARETO_ALPHA
+        cap = int(mean * MAX_COMMENTS_FACTOR) + 1
+        for _ in range(options.posts):
+            if rng.random() < options.future_ratio:
+                # Отложенная публикация до месяца вперёд, ещё без
+                # комментариев.
+                yield self.now + timedelta(
+                    minutes=rng.randint(1, 30 * 24 * 60)), 0
+                continue
+            pub_date = self.now - timedelta(
+                minutes=rng.randint(0, options.days * 24 * 60))
+            # Случайное округление сохраняет среднее.
+            count = scale * rng.paretovariate(PARETO_ALPHA) + rng.random()
+            yield pub_date, min(cap, int(count))
+
+    def placeholders(self):
+        """Имена заглушек изображений и общие для них копии.
+
+        Заглушки разделяются многими постами, поэтому и копии строятся
+        один раз на заглушку, а не на пост.
+        """
+        result = []
+        for index in range(self.options.images):
+            color = PLACEHOLDER_COLORS[index % len(PLACEHOLDER_COLORS)]
+            buffer = BytesIO()
+            Image.new('RGB', (1600, 1000), color).save(buffer, 'JPEG')
+            name = default_storage.save(
+                f'post_images/seed/placeholder-{index}.jpg',
+                ContentFile(buffer.getvalue()))
+            image = Post(image=name).image
+            result.append((name, build_renditions(image)))
+        return result
+
+    def posts(self, first_pk, users, categories, locations, placeholders):
+        options = self.options
+        rng = self.rng('posts')
+        titles = [
+            sentence(rng, 2, 6).capitalize() for _ in range(TEXT_POOL_SIZE)]
+        texts = []
+        for _ in range(TEXT_POOL_SIZE):
+            text = paragraph(rng)
+            texts.append((text, make_excerpt(text)))
+        for offset, (pub_date, comment_count) in enumerate(self.schedule()):
+            text, excerpt = texts[rng.randrange(TEXT_POOL_SIZE)]
+            image, renditions = '', {}
+            if placeholders and rng.random() < options.image_ratio:
+                image, renditions = rng.choice(placeholders)
+            yield Post(
+                pk=first_pk + offset,
+                title=titles[rng.randrange(TEXT_POOL_SIZE)],
+                text=text,
+                excerpt=excerpt,
+                pub_date=pub_date,
+                author_id=users + skewed(rng, options.users, options.skew),
+                category_id=(
+                    categories + skewed(rng, options.categories, options.skew)
+                    if options.categories else None),
+                location_id=(
+                    locations + rng.randrange(options.locations)
+                    if options.locations and rng.random() < 0.7 else None),
+                is_published=rng.random() >= options.unpublished_ratio,
+                image=image,
+                renditions=renditions,
+                comment_count=comment_count,
+                created_at=min(pub_date, self.now),
+                updated_at=self.now,
+            )
+
+    def comments(self, first_pk, posts, users):
+        options = self.options
+        rng = self.rng('comments')
+        texts = [
+            sentence(rng, 3, 30).capitalize() for _ in range(TEXT_POOL_SIZE)]
+        pk = first_pk
+        for offset, (pub_date, count) in enumerate(self.schedule()):
+            age = max(0, int((self.now - pub_date).total_seconds()))
+            for _ in range(count):
+                yield Comment(
+                    pk=pk,
+                    post_id=posts + offset,
+                    author_id=users + skewed(rng, options.users, options.skew),
+                    text=texts[rng.randrange(TEXT_POOL_SIZE)],
+                    created_at=pub_date + timedelta(
+                        seconds=rng.randint(0, age)),
+                )
+                pk += 1
+
+    def run(self):
+        User = get_user_model()
+        starts = {
+            model: next_pk(model)
+            for model in (User, Category, Location, Post, Comment)
+        }
+        self.insert(User, self.users(starts[User]))
+        self.insert(Category, self.categories(starts[Category]))
+        self.insert(Location, self.locations(starts[Location]))
+        placeholders = self.placeholders() if self.options.posts else []
+        self.insert(Post, self.posts(
+            starts[Post], starts[User], starts[Category], starts[Location],
+            placeholders,
+        ))
+        self.insert(Comment, self.comments(
+            starts[Comment], starts[Post], starts[User]))
+        reset_sequences([User, Category, Location, Post, Comment])
+        page_cache.bump(page_cache.GLOBAL_SCOPE)
+        return self.stats
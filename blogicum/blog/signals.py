@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import page_cache
+from .models import Category, Comment, Location, Post, deleting_post_ids
+from .tasks import build_post_renditions
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if instance.post_id in deleting_post_ids():
+        return
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def schedule_post_renditions(sender, instance, **kwargs):
+    if {'image', 'renditions'} & instance.get_deferred_fields():
+        return
+    source = (instance.renditions or {}).get('source')
+    if source != (instance.image.name or None):
+        # Задача попадёт в таблицу в той же транзакции, что и пост, и
+        # обработчик увидит её только после фиксации изменений.
+        build_post_renditions.enqueue(instance.pk)
+
+
+def post_cache_scopes(post_id):
+    """Области кеша страниц, на которых виден пост."""
+    scopes = ['index', f'post:{post_id}']
+    row = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username').first()
+    if row is not None:
+        category_slug, username = row
+        scopes.append(f'profile:{username}')
+        if category_slug:
+            scopes.append(f'category:{category_slug}')
+    return scopes
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_cache_scopes(sender, instance, **kwargs):
+    # Пост мог сменить категорию или автора: старые страницы тоже устарели.
+    instance._old_cache_scopes = (
+        post_cache_scopes(instance.pk) if instance.pk else [])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    scopes = set(getattr(instance, '_old_cache_scopes', []))
+    scopes.update(post_cache_scopes(instance.pk))
+    page_cache.bump(*scopes)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    if instance.post_id in deleting_post_ids():
+        return
+    # Число комментариев выводится и в карточках лент.
+    page_cache.bump(*post_cache_scopes(instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, **kwargs):
+    page_cache.bump(page_cache.GLOBAL_SCOPE)
+
+
+def user_cache_scopes(user_id):
+    """Области кеша страниц, на которых видно имя пользователя.
+
+    Это лента, категории его постов, сами посты и посты с его
+    комментариями.
+    """
+    scopes = {'index'}
+    authored = Post.objects.filter(author_id=user_id).values_list(
+        'pk', 'category__slug')
+    for post_id, category_slug in authored.iterator():
+        scopes.add(f'post:{post_id}')
+        if category_slug:
+            scopes.add(f'category:{category_slug}')
+    commented = Comment.objects.filter(author_id=user_id).values_list(
+        'post_id', flat=True).distinct()
+    scopes.update(f'post:{post_id}' for post_id in commented.iterator())
+    return scopes
+
+
+def _only_last_login(update_fields):
+    # Вход обновляет только last_login, которого нет ни на одной странице.
+    return bool(update_fields) and set(update_fields) <= {'last_login'}
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, **kwargs):
+    instance._old_username = None
+    if instance.pk and not _only_last_login(update_fields):
+        instance._old_username = User.objects.filter(
+            pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_pages(sender, instance, update_fields=None, **kwargs):
+    if _only_last_login(update_fields):
+        return
+    # Имя, дату регистрации и роль показывает только профиль; остальные
+    # страницы выводят лишь имя пользователя.
+    old_username = getattr(instance, '_old_username', None)
+    scopes = {f'profile:{instance.username}'}
+    if old_username and old_username != instance.username:
+        scopes.add(f'profile:{old_username}')
+        scopes.update(user_cache_scopes(instance.pk))
+    page_cache.bump(*scopes)
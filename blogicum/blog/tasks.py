@@ -0,0 +1,24 @@
+from django.utils import timezone
+
+from core.queue import task
+
+from .models import Post
+from .renditions import refresh_post_renditions
+
+
+@task
+def build_post_renditions(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'pk', 'image', 'renditions').first()
+    if post is None:
+        return
+    renditions = refresh_post_renditions(post)
+    if renditions is not None:
+        # updated_at входит в ключ кеша карточки: сбрасываем и его.
+        Post.objects.filter(pk=post_id).update(
+            renditions=renditions, updated_at=timezone.now())
+
+
+@task
+def repair_comment_counts(post_ids):
+    Post.objects.filter(pk__in=post_ids).repair_comment_counts()
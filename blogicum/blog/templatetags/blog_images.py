@@ -0,0 +1,35 @@
+from django import template
+
+register = template.Library()
+
+CARD_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+def _srcset(storage, variants, key):
+    widths = {}
+    for variant in variants.values():
+        widths.setdefault(variant['width'], storage.url(variant[key]))
+    return ', '.join(f'{url} {width}w' for width, url in widths.items())
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, variant='card', sizes=CARD_SIZES, lazy=True):
+    """Изображение поста с ``srcset`` из подготовленных копий.
+
+    Пока копии не готовы, выводится оригинал, как и раньше.
+    """
+    storage = post.image.storage
+    variants = (post.renditions or {}).get('variants')
+    context = {'original_url': post.image.url, 'lazy': lazy}
+    if not variants or variant not in variants:
+        return context
+    chosen = variants[variant]
+    context.update({
+        'src': storage.url(chosen['fallback']),
+        'width': chosen['width'],
+        'height': chosen['height'],
+        'srcset': _srcset(storage, variants, 'fallback'),
+        'webp_srcset': _srcset(storage, variants, 'webp'),
+        'sizes': sizes,
+    })
+    return context
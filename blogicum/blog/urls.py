@@ -1,9 +1,10 @@
 from django.urls import path
 
 from .views import (CategoryListView, CommentCreateView, CommentDeleteView,
-                    CommentUpdateView, PasswordUpdateView, PostCreateView,
-                    PostDeleteView, PostDetailView, PostListView,
-                    PostUpdateView, UserListView, UserUpdateView)
+                    CommentListView, CommentUpdateView, PasswordUpdateView,
+                    PostCreateView, PostDeleteView, PostDetailView,
+                    PostListView, PostUpdateView, UserListView,
+                    UserUpdateView)
 
 app_name = 'blog'
 
@@ -29,6 +30,8 @@ urlpatterns = [
          UserListView.as_view(), name='profile'),
 
 
+    path('posts/<int:post_id>/comments/',
+         CommentListView.as_view(), name='comments'),
     path('posts/<int:post_id>/comment/',
          CommentCreateView.as_view(), name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
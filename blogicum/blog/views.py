@@ -1,34 +1,151 @@
-from django.contrib.auth.mixins import (LoginRequiredMixin,
-                                        PermissionRequiredMixin)
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
-from django.core.exceptions import PermissionDenied
-from django.db.models import Count
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone as dt
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  TemplateView, UpdateView)
 
-from .constants import PAGINATE_COUNT
+from .constants import (COMMENTS_PAGINATE_COUNT, PAGINATE_COUNT,
+                        PAGINATE_ON_EACH_SIDE, PAGINATE_ON_ENDS)
 from .forms import CommentForm, PostForm, ProfileForm
 from .models import Category, Comment, Post
+from .page_cache import (GLOBAL_SCOPE, AnonymousPageCacheMixin,
+                         ConditionalGetMixin, PostCardCacheMixin,
+                         cached_feed_state, last_bumped)
+from .pagination import (CursorPaginator, EstimatedCountPaginator,
+                         InvalidCursor)
 
 
-class PostListView(ListView):
-    model = Post
+class FeedPaginationMixin:
+    """Постраничная навигация ленты: по номеру страницы или по курсору.
+
+    Курсорный режим включается настройкой ``BLOG_FEED_PAGINATION = 'cursor'``
+    или параметром ``?cursor=`` в запросе.
+    """
+
     paginate_by = PAGINATE_COUNT
+    paginator_class = EstimatedCountPaginator
+    cursor_ordering = ('-pub_date', '-pk')
+
+    def uses_cursor_pagination(self):
+        return ('cursor' in self.request.GET or getattr(
+            settings, 'BLOG_FEED_PAGINATION', 'page') == 'cursor')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.uses_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None and not getattr(page, 'is_cursor', False):
+            # Окно номеров вокруг текущей страницы вместо всех страниц.
+            context['page_range'] = page.paginator.get_elided_page_range(
+                page.number,
+                on_each_side=PAGINATE_ON_EACH_SIDE,
+                on_ends=PAGINATE_ON_ENDS,
+            )
+        return context
+
+
+def comments_page(post, cursor=None):
+    """Порция комментариев поста от старых к новым после ``cursor``."""
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_PAGINATE_COUNT,
+        ordering=('created_at', 'pk'),
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404('Некорректный курсор комментариев.')
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin):
+    """Валидаторы ленты без агрегатов по всем видимым постам.
+
+    Правки постов и комментариев, снятие с публикации и удаление сдвигают
+    поколения областей ленты, а те уже входят в ETag; Last-Modified берёт
+    время последнего сдвига. Остаётся только наступление ``pub_date``
+    отложенного поста: его ловит дата самого свежего видимого поста —
+    один ``LIMIT 1`` в порядке ленты, который обслуживает индекс по
+    ``pub_date``.
+    """
+
+    def get_validator_state(self):
+        scopes = [GLOBAL_SCOPE, *self.get_page_cache_scopes()]
+        state = cached_feed_state(
+            self.request,
+            scopes,
+            lambda: {'latest': self.get_queryset().values_list(
+                'pub_date', flat=True).first()},
+        )
+        latest = state['latest']
+        last_modified = datetime.fromtimestamp(
+            last_bumped(scopes), timezone.utc)
+        if latest is not None:
+            # Автор видит в профиле и отложенные посты: дата из будущего
+            # заслонила бы все изменения до неё.
+            last_modified = max(last_modified, min(latest, timezone.now()))
+        return last_modified, [latest]
+
+
+class OwnerRequiredMixin:
+    """Пускает к объекту только его автора.
+
+    Объект загружается одним запросом и переиспользуется до конца запроса:
+    и для проверки прав, и для формы. Постороннему по умолчанию отвечает
+    404; ``handle_not_owner`` можно переопределить.
+    """
+
+    _owned_object = None
+
+    def get_object(self, queryset=None):
+        if self._owned_object is None:
+            self._owned_object = super().get_object(queryset)
+        return self._owned_object
+
+    def is_owner(self, obj):
+        return obj.author_id == self.request.user.pk
+
+    def handle_not_owner(self, obj):
+        raise Http404
+
+    def dispatch(self, request, *args, **kwargs):
+        obj = self.get_object()
+        if not self.is_owner(obj):
+            return self.handle_not_owner(obj)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class PostListView(AnonymousPageCacheMixin, FeedConditionalGetMixin,
+                   PostCardCacheMixin, FeedPaginationMixin, ListView):
+    model = Post
     template_name = 'blog/index.html'
 
-    def get_queryset(self):
-        queryset = Post.objects.annotate(
-            comment_count=Count('comments')).filter(
-            pub_date__lte=dt.now(),
-            is_published=True,
-            category__is_published=True
-        ).order_by('-pub_date')
+    def get_page_cache_scopes(self):
+        return ['index']
 
-        return queryset
+    def get_queryset(self):
+        return (
+            Post.objects.published()
+            .with_relations()
+            .with_comment_count()
+            .for_feed()
+            .order_by('-pub_date')
+        )
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
@@ -48,98 +165,107 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return reverse_lazy('blog:profile', kwargs={'username': username})
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                     DetailView):
     model = Post
     pk_url_kwarg = 'post_id'
     template_name = 'blog/detail.html'
+    _post = None
+
+    def get_page_cache_scopes(self):
+        return [f"post:{self.kwargs['post_id']}"]
+
+    def get_validator_state(self):
+        post = self.get_object()
+        return post.updated_at, [post.pk, post.comment_count]
 
     def get_object(self):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if post.author == self.request.user:
-            return post
+        # Видимость проверяет база: чужой неопубликованный пост не найдётся.
+        # Пост нужен и валидаторам, и странице: загружаем его один раз.
+        if self._post is None:
+            self._post = get_object_or_404(
+                Post.objects.visible_to(self.request.user).with_relations(),
+                pk=self.kwargs['post_id'],
+            )
+        return self._post
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['form'] = CommentForm()
+        context['comments'] = comments_page(
+            self.object, self.request.GET.get('comments'))
+        return context
 
-        if not post.is_published:
-            raise Http404
 
-        if not post.category.is_published:
-            raise Http404
+class CommentListView(AnonymousPageCacheMixin, TemplateView):
+    """HTML-фрагмент со следующей порцией комментариев для «Показать ещё»."""
 
-        if post.pub_date > dt.now():
-            raise Http404
+    template_name = 'includes/comment_list.html'
 
-        return post
+    def get_page_cache_scopes(self):
+        return [f"post:{self.kwargs['post_id']}"]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        post = get_object_or_404(
+            Post.objects.visible_to(self.request.user).only('pk'),
+            pk=self.kwargs['post_id'],
+        )
+        context['post'] = post
+        context['comments'] = comments_page(
+            post, self.request.GET.get('cursor'))
         return context
 
 
-class PostUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+class PostUpdateView(LoginRequiredMixin, OwnerRequiredMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
     login_url = '/auth/login/'
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        if not self.has_permission():
-            return redirect('blog:post_detail', self.get_object().pk)
-        get_object_or_404(Post, pk=kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
-
-    def has_permission(self):
-        post = self.get_object()
-        return self.request.user == post.author
+    def handle_not_owner(self, obj):
+        return redirect('blog:post_detail', obj.pk)
 
     def get_success_url(self):
         return reverse_lazy('blog:post_detail',
                             kwargs={'post_id': self.object.pk})
 
 
-class PostDeleteView(LoginRequiredMixin, DeleteView):
+class PostDeleteView(LoginRequiredMixin, OwnerRequiredMixin, DeleteView):
     model = Post
     template_name = 'blog/create.html'
     login_url = '/auth/login/'
     success_url = reverse_lazy('blog:index')
     pk_url_kwarg = 'post_id'
 
-    def get_queryset(self):
-        return Post.objects.filter(
-            author=self.request.user, pk=self.kwargs['post_id'])
-
-    def get_object(self, queryset=None):
-        obj = super().get_object(queryset=queryset,)
-        if obj.author != self.request.user:
-            raise PermissionDenied
-        return obj
-
 
-class CategoryListView(ListView):
+class CategoryListView(AnonymousPageCacheMixin, FeedConditionalGetMixin,
+                       PostCardCacheMixin, FeedPaginationMixin, ListView):
     model = Category
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
-    paginate_by = PAGINATE_COUNT
 
-    def dispatch(self, request, *args, **kwargs):
-        self.category = get_object_or_404(
+    def get_page_cache_scopes(self):
+        return [f"category:{self.kwargs['category_slug']}"]
+
+    @cached_property
+    def category(self):
+        return get_object_or_404(
             Category,
-            slug=kwargs['category_slug'],
+            slug=self.kwargs['category_slug'],
             is_published=True,
         )
-        return super().dispatch(request, *args, **kwargs)
 
     def get_queryset(self):
-        return Post.objects.select_related(
-            'author',
-            'location',
-            'category',
-        ).filter(
-            is_published=True,
-            category=self.category,
-            pub_date__lte=dt.now(),
-        ).order_by('-pub_date')
+        return (
+            Post.objects.published()
+            .filter(category=self.category)
+            .with_relations()
+            .with_comment_count()
+            .for_feed()
+            .order_by('-pub_date')
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -147,36 +273,32 @@ class CategoryListView(ListView):
         return context
 
 
-class UserListView(ListView):
+class UserListView(AnonymousPageCacheMixin, FeedConditionalGetMixin,
+                   PostCardCacheMixin, FeedPaginationMixin, ListView):
     template_name = 'blog/profile.html'
     slug_url_kwarg = 'username'
-    paginate_by = PAGINATE_COUNT
+
+    def get_page_cache_scopes(self):
+        return [f"profile:{self.kwargs['username']}"]
+
+    @cached_property
+    def profile(self):
+        return get_object_or_404(User, username=self.kwargs['username'])
 
     def get_queryset(self):
-        if self.request.user.username != self.kwargs['username']:
-            queryset = Post.objects.select_related(
-                'author',
-                'location'
-            ).annotate(comment_count=Count('comments')).filter(
-                pub_date__lt=dt.now(),
-                is_published__exact=True,
-                author__username=self.kwargs['username']
-            ).order_by('-pub_date')
-        else:
-            queryset = Post.objects.select_related(
-                'author',
-                'location'
-            ).annotate(comment_count=Count('comments')).filter(
-                author__username=self.kwargs['username']
-            ).order_by('-pub_date')
-
-        return queryset
+        queryset = Post.objects.filter(author=self.profile)
+        if self.request.user != self.profile:
+            queryset = queryset.published()
+        return (
+            queryset.with_relations()
+            .with_comment_count()
+            .for_feed()
+            .order_by('-pub_date')
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User,
-            username=self.kwargs['username'])
+        context['profile'] = self.profile
         return context
 
 
@@ -215,33 +337,27 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']})
 
 
-class CommentUpdateView(LoginRequiredMixin, UpdateView):
+class CommentUpdateView(LoginRequiredMixin, OwnerRequiredMixin, UpdateView):
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def get_object(self):
-        comment = get_object_or_404(Comment, pk=self.kwargs['comment_id'])
-        if comment.author != self.request.user:
-            raise Http404
-        return comment
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
 
     def get_success_url(self):
         return reverse(
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']})
 
 
-class CommentDeleteView(LoginRequiredMixin, DeleteView):
+class CommentDeleteView(LoginRequiredMixin, OwnerRequiredMixin, DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def get_object(self):
-        comment = get_object_or_404(Comment, pk=self.kwargs['comment_id'])
-        if comment.author != self.request.user:
-            raise Http404
-        return comment
+    def get_queryset(self):
+        return Comment.objects.filter(post_id=self.kwargs['post_id'])
 
     def get_success_url(self):
         return reverse(
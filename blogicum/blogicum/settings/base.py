@@ -0,0 +1,212 @@
+import os
+import secrets
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def load_secret_key(path):
+    """Ключ из файла; при первом запуске файл создаётся.
+
+    Ключ должен быть одинаковым у всех процессов и переживать перезапуск,
+    иначе сессии и CSRF-токены становятся недействительными. Ключ сначала
+    пишется во временный файл и лишь затем атомарно ставится на место
+    через ``os.link``: параллельно стартующий процесс увидит либо готовый
+    ключ, либо отсутствие файла, но не пустой файл.
+    """
+    path = Path(path)
+    try:
+        return path.read_text().strip()
+    except FileNotFoundError:
+        pass
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f'{path.name}.')
+    try:
+        with os.fdopen(fd, 'w') as fh:
+            fh.write(secrets.token_hex(32))
+        try:
+            os.link(temp, path)
+        except FileExistsError:
+            # Другой процесс успел раньше: берём его ключ.
+            pass
+    finally:
+        os.unlink(temp)
+    return path.read_text().strip()
+
+
+SECRET_KEY = os.getenv('DJANGO_SECRET_KEY') or load_secret_key(
+    os.getenv('DJANGO_SECRET_KEY_FILE', BASE_DIR / '.secret_key'))
+
+DEBUG = False
+
+ALLOWED_HOSTS = []
+
+
+INSTALLED_APPS = [
+    'blog.apps.BlogConfig',
+    'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'django_bootstrap5',
+]
+
+MIDDLEWARE = [
+    'core.profiling.RequestProfilerMiddleware',
+    'core.nplusone.NPlusOneMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'blogicum.urls'
+
+TEMPLATES_DIR = BASE_DIR / 'templates'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'blogicum.wsgi.application'
+
+
+CACHES = {
+    # Кеш процесса годится для разработки с одним процессом. Поколения кеша
+    # страниц и карточек в нём не видны другим обработчикам, поэтому профиль
+    # prod заменяет его общим.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    },
+    # Сессии в памяти процесса: для разработки с одним процессом этого
+    # достаточно, а prod кладёт их в общий memcached, чтобы выход из
+    # аккаунта в одном обработчике не оставлял сессию живой в другом.
+    # Запас записей — на все сессии, живущие две недели: при переполнении
+    # кеш выбрасывает треть записей, и сессии снова читались бы из таблицы.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'TIMEOUT': 60 * 60 * 24 * 14,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.getenv('DJANGO_SESSION_CACHE_MAX_ENTRIES', 100_000)),
+        },
+    },
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+LANGUAGE_CODE = 'ru-RU'
+
+TIME_ZONE = 'Europe/Moscow'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+STATIC_URL = '/static/'
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+]
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+LOGIN_REDIRECT_URL = 'blog:index'
+
+LOGIN_URL = 'login'
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+SERVER_ERROR_VIEW = 'core.views.server_error'
+
+BLOG_FEED_PAGINATION = 'page'
+
+BLOG_PAGE_CACHE_TIMEOUT = 60
+
+BLOG_CARD_CACHE_TIMEOUT = 60 * 60
+
+BLOG_FEED_STATE_TIMEOUT = 0
+
+BLOG_ESTIMATED_COUNT_THRESHOLD = 10_000
+
+BLOG_COUNT_CACHE_TIMEOUT = 5 * 60
+
+TASKS_ALWAYS_EAGER = False
+
+TASKS_WORKER_CONCURRENCY = 2
+
+TASKS_LEASE_SECONDS = 300
+
+PROFILER_ENABLED = True
+
+PROFILER_SERVER_TIMING = True
+
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0.01))
+
+PROFILER_LOG_PATH = BASE_DIR / 'logs' / 'requests.jsonl'
+
+PROFILER_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+PROFILER_LOG_BACKUPS = 3
+
+NPLUSONE_MODE = os.getenv('NPLUSONE_MODE', 'off')
+
+NPLUSONE_THRESHOLD = 3
@@ -0,0 +1,79 @@
+"""Боевой профиль.
+
+Без DEBUG (иначе ``connection.queries`` копит каждый SQL-запрос) и без
+панели отладки; шаблоны компилируются один раз, соединения с базой
+переживают запрос, статика раздаётся с хешем содержимого в имени.
+"""
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import BASE_DIR, CACHES, DATABASES, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host
+]
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': int(os.getenv('DJANGO_CONN_MAX_AGE', 60)),
+    },
+}
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Кеш страниц, карточек и поколений их областей общий для всех
+# обработчиков: правка, сохранённая одним процессом, должна сбрасывать кеш
+# и в остальных. По умолчанию это memcached (адреса через запятую в
+# DJANGO_MEMCACHED_LOCATION, нужен пакет pymemcache).
+# DJANGO_CACHE_BACKEND=file — запасной вариант для одной машины без
+# memcached: FileBasedCache перебирает весь каталог при каждой записи,
+# поэтому записей в нём держим немного.
+if os.getenv('DJANGO_CACHE_BACKEND', 'memcached') == 'file':
+    default_cache = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'DJANGO_CACHE_DIR', BASE_DIR / '.cache' / 'default'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('DJANGO_CACHE_MAX_ENTRIES', 1000)),
+        },
+    }
+else:
+    default_cache = {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.getenv(
+            'DJANGO_MEMCACHED_LOCATION', '127.0.0.1:11211').split(','),
+    }
+
+CACHES = {**CACHES, 'default': default_cache}
+
+if default_cache['BACKEND'].endswith('PyMemcacheCache'):
+    CACHES['sessions'] = {
+        **default_cache,
+        'KEY_PREFIX': 'sessions',
+        'TIMEOUT': CACHES['sessions']['TIMEOUT'],
+    }
+else:
+    # Сессиям нужен общий кеш; без memcached они читаются из базы.
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+BLOG_FEED_STATE_TIMEOUT = 60
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STATICFILES_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage')
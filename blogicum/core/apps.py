@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+    verbose_name = 'Служебное'
+
+    def ready(self):
+        # Регистрируем фоновые задачи из модулей tasks.py всех приложений.
+        autodiscover_modules('tasks')
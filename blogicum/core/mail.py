@@ -0,0 +1,57 @@
+import base64
+
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+def serialize_message(message):
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': [
+            (filename, base64.b64encode(
+                content.encode() if isinstance(content, str) else content
+            ).decode(), mimetype)
+            for filename, content, mimetype in message.attachments
+        ],
+    }
+
+
+def deserialize_message(data, connection=None):
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        connection=connection,
+    )
+    for filename, content, mimetype in data['attachments']:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь фоновых задач вместо отправки в запросе.
+
+    Обработчик отправит их через бэкенд из настройки
+    ``TASKS_EMAIL_BACKEND``.
+    """
+
+    def send_messages(self, email_messages):
+        from .tasks import send_email
+
+        for message in email_messages:
+            send_email.enqueue(serialize_message(message))
+        return len(email_messages)
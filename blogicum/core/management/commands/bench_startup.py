@@ -0,0 +1,128 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в отдельном процессе: иначе модули уже импортированы и
+# замер покажет не холодный старт, а кеш интерпретатора.
+CHILD = '''
+import json
+import sys
+import time
+
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+imported = time.perf_counter()
+django.setup()
+ready = time.perf_counter()
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils.module_loading import import_string
+
+overrides = {'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver']}
+storage = import_string(settings.STATICFILES_STORAGE)
+if (issubclass(storage, ManifestStaticFilesStorage)
+        and not storage().exists(storage.manifest_name)):
+    # Без collectstatic манифеста нет, и {% static %} упадёт.
+    overrides['STATICFILES_STORAGE'] = (
+        'django.contrib.staticfiles.storage.StaticFilesStorage')
+url, repeat = sys.argv[1], int(sys.argv[2])
+with override_settings(**overrides):
+    client = Client()
+    before = time.perf_counter()
+    status = client.get(url).status_code
+    first = time.perf_counter()
+    warm = []
+    for _ in range(repeat):
+        request_started = time.perf_counter()
+        client.get(url)
+        warm.append(time.perf_counter() - request_started)
+
+print(json.dumps({
+    'status': status,
+    'settings_ms': (imported - started) * 1000,
+    'setup_ms': (ready - imported) * 1000,
+    'first_request_ms': (first - before) * 1000,
+    'warm_request_ms': sorted(warm)[len(warm) // 2] * 1000,
+}))
+'''
+
+METRICS = ('settings_ms', 'setup_ms', 'first_request_ms', 'warm_request_ms')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время запуска процесса и первого запроса для профилей '
+        'настроек dev и prod.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            choices=('dev', 'prod'),
+            help='Профиль настроек; по умолчанию оба.',
+        )
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Сколько раз запускать процесс для каждого профиля.',
+        )
+        parser.add_argument(
+            '--url', default='/pages/about/',
+            help='Адрес первого запроса.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько повторных запросов делать после первого.',
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Вывести результат в JSON.',
+        )
+
+    def measure(self, profile, url, repeat):
+        env = {
+            **os.environ,
+            'DJANGO_ENV': profile,
+            'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+            # Замер старта не должен требовать запущенного memcached.
+            'DJANGO_CACHE_BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'file'),
+        }
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD, url, str(repeat)],
+            cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(
+                f'Профиль {profile} не запустился:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, profiles, runs, url, repeat, **options):
+        report = {}
+        for profile in profiles or ('dev', 'prod'):
+            samples = [self.measure(profile, url, repeat) for _ in range(runs)]
+            if any(sample['status'] != 200 for sample in samples):
+                raise CommandError(
+                    f'{url} в профиле {profile} ответил не 200.')
+            report[profile] = {
+                metric: round(statistics.median(
+                    sample[metric] for sample in samples), 2)
+                for metric in METRICS
+            }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f'Медиана по {runs} запускам, мс:\n'
+            f"{'профиль':<8}" + ''.join(f'{name:>18}' for name in METRICS))
+        for profile, values in report.items():
+            self.stdout.write(f'{profile:<8}' + ''.join(
+                f'{values[name]:>18.2f}' for name in METRICS))
@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import queue
+
+
+def work(worker_id, stop, batch_size, lease, poll_interval, once):
+    """Цикл одного обработчика: аренда пачки, выполнение, пауза."""
+    while not stop.is_set():
+        tasks = queue.claim(worker_id, batch_size, lease)
+        for task_obj in tasks:
+            queue.run(task_obj, worker_id)
+        if not tasks:
+            if once:
+                break
+            stop.wait(poll_interval)
+
+
+def _thread_main(*args):
+    try:
+        work(*args)
+    finally:
+        connections.close_all()
+
+
+def _process_main(*args):
+    import django
+    django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _thread_main(*args)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчик фоновых задач из таблицы core.Task.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'TASKS_WORKER_CONCURRENCY', 2),
+            help='Число параллельных обработчиков.',
+        )
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread',
+            help='Потоки (по умолчанию) или отдельные процессы.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10,
+            help='Сколько задач забирать в аренду за раз.',
+        )
+        parser.add_argument(
+            '--lease', type=int,
+            default=getattr(settings, 'TASKS_LEASE_SECONDS', 300),
+            help='Срок аренды задачи в секундах.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, concurrency, pool, batch_size, lease,
+               poll_interval, once, **options):
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        if pool == 'process':
+            # Открытые соединения нельзя наследовать дочерним процессам.
+            connections.close_all()
+            stop = multiprocessing.Event()
+            start = multiprocessing.Process
+            target = _process_main
+        else:
+            stop = threading.Event()
+            start = threading.Thread
+            target = _thread_main
+        workers = [
+            start(
+                target=target,
+                args=(f'{prefix}:{number}', stop, batch_size, lease,
+                      poll_interval, once),
+                daemon=True,
+            )
+            for number in range(concurrency)
+        ]
+
+        def shutdown(signum, frame):
+            self.stdout.write('Завершаем текущие задачи...')
+            stop.set()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        self.stdout.write(
+            f'Обработчиков: {concurrency} ({pool}), аренда {lease} с.')
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,104 @@
+"""Поиск N+1: один и тот же SQL, повторённый в запросе много раз.
+
+Обычно это ленивая загрузка связи в цикле шаблона, например
+``{{ post.location.name }}`` без ``select_related``. Режим задаёт
+``NPLUSONE_MODE``: ``off``, ``log`` (предупреждение в журнал) или
+``raise`` (исключение; включается в тестах).
+"""
+import logging
+import os
+import sys
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import profiling
+
+logger = logging.getLogger(__name__)
+
+# Обёртки execute_wrapper: их кадры не указывают на источник запроса.
+_WRAPPER_FILES = {__file__, profiling.__file__}
+
+
+class NPlusOneQueries(Exception):
+    pass
+
+
+def trigger_location():
+    """Узел шаблона и строка кода проекта, откуда пришёл запрос."""
+    template = code = None
+    project_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None and (template is None or code is None):
+        if template is None and frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                name = origin.template_name or origin.name
+                template = f'{name}, строка {token.lineno}'
+        filename = frame.f_code.co_filename
+        if (code is None and filename.startswith(project_dir)
+                and 'site-packages' not in filename
+                and filename not in _WRAPPER_FILES):
+            code = (f'{os.path.relpath(filename, project_dir)}:'
+                    f'{frame.f_lineno}')
+        frame = frame.f_back
+    return template, code
+
+
+class QueryShapeTracker:
+    """Обёртка ``connection.execute_wrapper``, считающая повторы SQL.
+
+    SQL приходит с плейсхолдерами, поэтому запросы к разным строкам
+    одной таблицы дают одинаковый текст.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.locations = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[sql] += 1
+        if self.counts[sql] == self.threshold:
+            # Стек разбираем только на пороге: дёшево для обычных запросов.
+            self.locations[sql] = trigger_location()
+        return execute(sql, params, many, context)
+
+    def report(self):
+        lines = []
+        for sql, (template, code) in self.locations.items():
+            lines.append(
+                f'{self.counts[sql]} одинаковых запросов: {sql}\n'
+                f'    шаблон: {template or "—"}\n'
+                f'    код: {code or "—"}'
+            )
+        return '\n'.join(lines)
+
+
+class NPlusOneMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, 'NPLUSONE_MODE', 'off')
+        if mode == 'off':
+            return self.get_response(request)
+        tracker = QueryShapeTracker(
+            getattr(settings, 'NPLUSONE_THRESHOLD', 3))
+        # Шаблонный ответ рендерится внутри get_response, так что ленивые
+        # загрузки из шаблона тоже попадают под обёртку.
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(tracker))
+            response = self.get_response(request)
+        if tracker.locations:
+            message = f'N+1 в {request.method} {request.path}:\n' + (
+                tracker.report())
+            if mode == 'raise':
+                raise NPlusOneQueries(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,190 @@
+"""Лёгкий профилировщик запросов для боевого окружения.
+
+``RequestProfilerMiddleware`` для каждого запроса считает время и число
+SQL-запросов, время представления и рендеринга шаблона и отдаёт их в
+заголовке ``Server-Timing``. Доля запросов (``PROFILER_SAMPLE_RATE``)
+пишется в JSONL-журнал с ротацией; ``collect_stats()`` сводит журнал в
+перцентили по имени маршрута.
+"""
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+PERCENTILES = (50, 95, 99)
+METRICS = ('total_ms', 'view_ms', 'render_ms', 'sql_ms', 'sql_count')
+
+_loggers = {}
+
+
+def sample_logger(path):
+    """Логгер выборки, пишущий в ``path`` с ротацией по размеру."""
+    path = Path(path)
+    if path not in _loggers:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=getattr(settings, 'PROFILER_LOG_MAX_BYTES', 10 << 20),
+            backupCount=getattr(settings, 'PROFILER_LOG_BACKUPS', 3),
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger = logging.getLogger(f'core.profiler.{len(_loggers)}')
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _loggers[path] = logger
+    return _loggers[path]
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.view_started = None
+        self.view_time = None
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Обёртка connection.execute_wrapper: считает каждый SQL-запрос.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - started
+
+    def view_finished(self):
+        if self.view_started is not None and self.view_time is None:
+            self.view_time = time.perf_counter() - self.view_started
+
+    def render_finished(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+
+    def timings(self):
+        total = time.perf_counter() - self.started
+        return {
+            'total_ms': round(total * 1000, 3),
+            'view_ms': round((self.view_time or 0) * 1000, 3),
+            'render_ms': round(self.render_time * 1000, 3),
+            'sql_ms': round(self.sql_time * 1000, 3),
+            'sql_count': self.sql_count,
+        }
+
+
+def server_timing(timings):
+    return ', '.join([
+        f"sql;dur={timings['sql_ms']};desc=\"{timings['sql_count']} SQL\"",
+        f"view;dur={timings['view_ms']}",
+        f"render;dur={timings['render_ms']}",
+        f"total;dur={timings['total_ms']}",
+    ])
+
+
+class RequestProfilerMiddleware:
+    """Замеры запроса в ``Server-Timing`` и выборочно в журнал.
+
+    Стоит первым в ``MIDDLEWARE``: тогда ``total`` охватывает весь стек, а
+    ``process_template_response`` вызывается непосредственно перед
+    рендерингом шаблона.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'PROFILER_ENABLED', True):
+            return self.get_response(request)
+        profile = request._profile = RequestProfile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        profile.view_finished()
+        timings = profile.timings()
+        if getattr(settings, 'PROFILER_SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(timings)
+        rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0)
+        if rate and random.random() < rate:
+            self.log(request, response, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.view_finished()
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(profile.render_finished)
+        return response
+
+    def log(self, request, response, timings):
+        match = request.resolver_match
+        record = {
+            'ts': round(time.time(), 3),
+            'route': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timings,
+        }
+        sample_logger(settings.PROFILER_LOG_PATH).info(
+            json.dumps(record, ensure_ascii=False))
+
+
+def _percentile(ordered, percent):
+    # Метод ближайшего ранга: значение, не меньше которого percent% выборки.
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[index]
+
+
+def read_samples(path):
+    """Записи журнала вместе с ротированными файлами, от старых к новым."""
+    path = Path(path)
+    files = sorted(
+        path.parent.glob(f'{path.name}.*'),
+        key=lambda item: int(item.suffix[1:]) if item.suffix[1:].isdigit()
+        else 0,
+        reverse=True,
+    )
+    for log_file in [*files, path]:
+        if not log_file.exists():
+            continue
+        with open(log_file, encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def collect_stats(samples):
+    """Перцентили метрик по имени маршрута."""
+    grouped = defaultdict(lambda: defaultdict(list))
+    for sample in samples:
+        route = sample.get('route') or sample.get('path')
+        for metric in METRICS:
+            grouped[route][metric].append(sample.get(metric, 0))
+    stats = {}
+    for route, metrics in sorted(grouped.items()):
+        stats[route] = {'count': len(metrics['total_ms'])}
+        for metric, values in metrics.items():
+            values.sort()
+            stats[route][metric] = {
+                f'p{percent}': _percentile(values, percent)
+                for percent in PERCENTILES
+            }
+    return stats
@@ -0,0 +1,116 @@
+"""Очередь фоновых задач на основе таблицы ``core.Task``.
+
+Функция регистрируется декоратором ``@task`` и ставится в очередь вызовом
+``func.enqueue(...)``; аргументы должны сериализоваться в JSON. Обработчик
+(``manage.py runworker``) забирает задачу в аренду условным UPDATE, поэтому
+одну задачу не выполнят два обработчика, а задачу упавшего обработчика
+подберут после истечения аренды.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func=None, *, name=None, max_attempts=3):
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _registry[task_name] = func
+
+        def enqueue(*args, run_at=None, **kwargs):
+            return enqueue_task(
+                task_name, *args, run_at=run_at,
+                max_attempts=max_attempts, **kwargs)
+
+        func.task_name = task_name
+        func.enqueue = enqueue
+        return func
+
+    return register(func) if func is not None else register
+
+
+def enqueue_task(name, *args, run_at=None, max_attempts=3, **kwargs):
+    if name not in _registry:
+        raise LookupError(f'Задача {name} не зарегистрирована.')
+    payload = {'args': list(args), 'kwargs': kwargs}
+    if getattr(settings, 'TASKS_ALWAYS_EAGER', False):
+        _registry[name](*args, **kwargs)
+        return None
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def _claimable(now):
+    return (
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim(worker_id, limit, lease_seconds):
+    """Забирает в аренду до ``limit`` задач, готовых к выполнению."""
+    now = timezone.now()
+    candidates = list(
+        Task.objects.filter(_claimable(now))
+        .order_by('run_at', 'pk')
+        .values_list('pk', flat=True)[:limit]
+    )
+    claimed = []
+    for pk in candidates:
+        # Условный UPDATE: проигравший гонку обработчик обновит 0 строк.
+        won = Task.objects.filter(_claimable(now), pk=pk).update(
+            status=Task.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=lease_seconds),
+            attempts=F('attempts') + 1,
+        )
+        if won:
+            claimed.append(pk)
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_at', 'pk'))
+
+
+def run(task_obj, worker_id):
+    """Выполняет задачу и записывает результат; возвращает успех."""
+    func = _registry.get(task_obj.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {task_obj.name} не зарегистрирована.')
+        func(*task_obj.payload.get('args', []),
+             **task_obj.payload.get('kwargs', {}))
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Задача %s завершилась ошибкой', task_obj)
+        retry = task_obj.attempts < task_obj.max_attempts
+        _finish(
+            task_obj, worker_id,
+            status=Task.QUEUED if retry else Task.FAILED,
+            last_error=error,
+            run_at=timezone.now() + timedelta(
+                seconds=2 ** task_obj.attempts * 10),
+            finished_at=None if retry else timezone.now(),
+        )
+        return False
+    _finish(
+        task_obj, worker_id, status=Task.DONE, finished_at=timezone.now())
+    return True
+
+
+def _finish(task_obj, worker_id, **fields):
+    # Если аренда истекла и задачу забрал другой обработчик, его запись
+    # главнее: обновляем только свою аренду.
+    Task.objects.filter(
+        pk=task_obj.pk, locked_by=worker_id, status=Task.RUNNING,
+    ).update(locked_by='', locked_until=None, **fields)
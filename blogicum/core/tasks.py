@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.core.mail import get_connection
+
+from .mail import deserialize_message
+from .queue import task
+
+
+@task(max_attempts=5)
+def send_email(data):
+    connection = get_connection(settings.TASKS_EMAIL_BACKEND)
+    deserialize_message(data, connection=connection).send()
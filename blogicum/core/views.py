@@ -1,5 +1,10 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from .profiling import collect_stats, read_samples
+
 
 def page_not_found(request, exception):
     context = {'exception': exception}
@@ -14,3 +19,10 @@ def csrf_failure(request, reason=''):
 def server_error(request, reason=''):
     context = {'reason': reason}
     return render(request, 'pages/500.html', context, status=500)
+
+
+@staff_member_required
+def profiler_stats(request):
+    stats = collect_stats(read_samples(settings.PROFILER_LOG_PATH))
+    return JsonResponse(
+        {'routes': stats}, json_dumps_params={'ensure_ascii': False})
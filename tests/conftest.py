@@ -32,6 +32,28 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def disable_view_caches():
+    # Закешированный ответ приходит без `response.context`, на который
+    # опираются проверки; кеши включают только их собственные тесты.
+    with override_settings(
+            BLOG_PAGE_CACHE_TIMEOUT=0, BLOG_CARD_CACHE_TIMEOUT=0):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def disable_profiler_sampling():
+    with override_settings(PROFILER_SAMPLE_RATE=0):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fail_on_n_plus_one():
+    # Повторяющиеся одинаковые запросы в одном HTTP-запросе — ошибка.
+    with override_settings(NPLUSONE_MODE='raise'):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -354,6 +376,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,137 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.contrib.admin import helpers
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog import page_cache
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST = '/admin/blog/post/'
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_locations):
+    return mixer.cycle(6).blend(
+        Post, author=mixer.sequence(*mixer.cycle(6).blend('auth.User')),
+        category=published_category,
+        location=mixer.sequence(*published_locations),
+    )
+
+
+def _queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(captured.captured_queries)
+
+
+def test_changelist_queries_do_not_grow_with_rows(
+        admin_client, mixer, posts):
+    _queries(admin_client, CHANGELIST)
+    few = _queries(admin_client, CHANGELIST)
+    mixer.cycle(10).blend(
+        Post, author=mixer.sequence(*mixer.cycle(10).blend('auth.User')),
+        category=posts[0].category)
+    assert _queries(admin_client, CHANGELIST) == few, (
+        "Убедитесь, что число запросов списка постов в админке не зависит"
+        " от числа строк: связи загружаются через `list_select_related`."
+    )
+
+
+@pytest.mark.parametrize('field', ['author', 'location', 'category'])
+def test_changelist_edits_fks_with_autocomplete(admin_client, posts, field):
+    page = BeautifulSoup(
+        admin_client.get(CHANGELIST).content.decode(), 'html.parser')
+    select = page.find('select', attrs={'name': f'form-0-{field}'})
+    assert select is not None, (
+        "Убедитесь, что автора, место и категорию можно править прямо в"
+        " списке постов."
+    )
+    assert 'admin-autocomplete' in select['class']
+    assert len(select.find_all('option', value=True)) <= 2, (
+        "Убедитесь, что в списке постов нет выпадающих списков со всеми"
+        " записями в каждой строке."
+    )
+    assert select.find('option', selected=True) is not None
+
+
+def test_changelist_saves_edited_author(admin_client, mixer, posts):
+    new_author = mixer.blend('auth.User')
+    page = BeautifulSoup(
+        admin_client.get(CHANGELIST).content.decode(), 'html.parser')
+    form = page.find('form', id='changelist-form')
+    data = {}
+    for element in form.find_all(['input', 'select']):
+        if not element.get('name') or element.get('type') == 'checkbox':
+            continue
+        if element.name == 'select':
+            option = element.find('option', selected=True)
+            data[element['name']] = option['value'] if option else ''
+        else:
+            data[element['name']] = element.get('value', '')
+    for element in form.find_all('input', type='checkbox', checked=True):
+        data[element['name']] = element.get('value', 'on')
+    data['form-0-author'] = new_author.pk
+    data['_save'] = 'Сохранить'
+    # Сохранение списка Django проверяет построчно, это не N+1 страницы.
+    with override_settings(NPLUSONE_MODE='off'):
+        response = admin_client.post(CHANGELIST, data)
+    assert response.status_code == 302
+    edited = Post.objects.get(pk=data['form-0-id'])
+    assert edited.author == new_author, (
+        "Убедитесь, что автор поста меняется из списка постов."
+    )
+
+
+def _run_action(client, action, posts, **data):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.post(CHANGELIST, {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts],
+            **data,
+        })
+    updates = [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    return response, updates
+
+
+@pytest.mark.parametrize('action, published', [
+    ('unpublish', False), ('publish', True)])
+def test_publish_actions_run_single_update(
+        admin_client, posts, action, published):
+    generation = page_cache.generations([page_cache.GLOBAL_SCOPE])[0]
+    response, updates = _run_action(admin_client, action, posts[:4])
+    assert response.status_code == 302
+    assert len(updates) == 1, (
+        "Убедитесь, что массовая публикация выполняется одним UPDATE."
+    )
+    assert Post.objects.filter(
+        pk__in=[post.pk for post in posts[:4]], is_published=published,
+    ).count() == 4
+    assert page_cache.generations(
+        [page_cache.GLOBAL_SCOPE])[0] != generation, (
+        "Убедитесь, что массовое действие сбрасывает кеш страниц."
+    )
+
+
+def test_recategorize_action(admin_client, mixer, posts):
+    target = mixer.blend('blog.Category', is_published=True)
+    response, updates = _run_action(admin_client, 'recategorize', posts[:3])
+    assert response.status_code == 200
+    assert 'Выбрано постов: 3' in response.content.decode()
+    assert not updates
+
+    response, updates = _run_action(
+        admin_client, 'recategorize', posts[:3],
+        apply='1', category=target.pk)
+    assert response.status_code == 302
+    assert len(updates) == 1
+    assert set(
+        Post.objects.filter(category=target).values_list('pk', flat=True)
+    ) == {post.pk for post in posts[:3]}
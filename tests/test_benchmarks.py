@@ -0,0 +1,295 @@
+"""Бюджеты SQL-запросов и время ответа каждого маршрута blog и pages.
+
+Тест наполняет базу крупным набором данных, обходит все маршруты тестовым
+клиентом и сохраняет JSON-отчёт: число запросов, суммарное время SQL и
+полное время ответа (медиана нескольких повторов). Тест падает, если
+маршрут превысил бюджет из ``benchmarks/budgets.json`` или ухудшился
+относительно ``benchmarks/baseline.json`` больше допустимого порога. Число
+запросов сравнивается строго, время — с широким относительным порогом и
+абсолютным запасом ``regression_slack_ms``: базовая линия записана на
+другой машине, и ловить имеет смысл только кратное замедление. Отдельный
+тест также замеряет список постов в админке (``BENCH_SCALE=50`` даёт
+100 000 постов и 50 000 пользователей).
+
+Переменные окружения:
+    BENCH_SCALE — множитель объёма данных (по умолчанию 1);
+    BENCH_REPORT — путь для JSON-отчёта;
+    BENCH_REPEAT — сколько раз замерять каждый маршрут (по умолчанию 3);
+    BENCH_TIME_THRESHOLD — порог для sql_ms и wall_ms вместо заданного в
+        budgets.json (например, 4 — допустимо +400%), off — не сравнивать
+        время;
+    BENCH_UPDATE_BASELINE=1 — перезаписать базовую линию текущим отчётом.
+"""
+import json
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, make_excerpt
+from blog.urls import app_name as blog_app_name
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import app_name as pages_app_name
+from pages.urls import urlpatterns as pages_urlpatterns
+
+pytestmark = [pytest.mark.django_db]
+
+BENCH_DIR = Path(__file__).parent / 'benchmarks'
+BUDGETS_PATH = BENCH_DIR / 'budgets.json'
+BASELINE_PATH = BENCH_DIR / 'baseline.json'
+METRICS = ('queries', 'sql_ms', 'wall_ms')
+
+
+def _load_json(path):
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def _iter_routes():
+    for namespace, patterns in (
+        (blog_app_name, blog_urlpatterns),
+        (pages_app_name, pages_urlpatterns),
+    ):
+        for pattern in patterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                yield f'{namespace}:{pattern.name}', pattern
+
+
+def _bulk_create(model, objects):
+    # SQLite в Django 3.2 не возвращает id из bulk_create: перечитываем.
+    last_pk = model.objects.order_by('-pk').values_list('pk', flat=True)
+    last_pk = last_pk.first() or 0
+    model.objects.bulk_create(objects, batch_size=500)
+    return list(model.objects.filter(pk__gt=last_pk).order_by('pk'))
+
+
+def _seed(scale):
+    factor = float(os.getenv('BENCH_SCALE', '1'))
+    sizes = {key: max(1, int(value * factor)) for key, value in scale.items()}
+    User = get_user_model()
+    users = _bulk_create(User, (
+        User(username=f'bench_user_{i}', password='!')
+        for i in range(sizes['users'])
+    ))
+    categories = _bulk_create(Category, (
+        Category(title=f'Категория {i}', description='Описание',
+                 slug=f'bench-category-{i}', is_published=i % 7 != 6)
+        for i in range(sizes['categories'])
+    ))
+    locations = _bulk_create(Location, (
+        Location(name=f'Место {i}', is_published=i % 5 != 4)
+        for i in range(sizes['locations'])
+    ))
+    now = timezone.now()
+    per_post = sizes['comments_per_post']
+    text = 'Слово ' * 200
+    posts = _bulk_create(Post, (
+        Post(
+            title=f'Пост {i}',
+            text=text,
+            excerpt=make_excerpt(text),
+            pub_date=now - timedelta(hours=i - 10),
+            author=users[i % len(users)],
+            category=categories[i % len(categories)],
+            location=locations[i % len(locations)] if i % 3 else None,
+            is_published=i % 11 != 10,
+            comment_count=per_post,
+        )
+        for i in range(sizes['posts'])
+    ))
+    _bulk_create(Comment, (
+        Comment(post=post, author=users[(post.pk + j) % len(users)],
+                text=f'Комментарий {j}')
+        for post in posts
+        for j in range(per_post)
+    ))
+    author = users[0]
+    post = Post.objects.filter(
+        author=author, is_published=True, category__is_published=True,
+        pub_date__lte=now,
+    ).first()
+    Comment.objects.create(post=post, author=author, text='Свой комментарий')
+    return {
+        'author': author,
+        'kwargs': {
+            'post_id': post.pk,
+            'comment_id': post.comments.filter(author=author).first().pk,
+            'category_slug': post.category.slug,
+            'username': author.username,
+        },
+    }
+
+
+class _SqlTimer:
+    # connection.queries округляет время до миллисекунды, а запросы
+    # маршрутов обычно короче: меряем сами.
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def _measure(client, url, repeat=1):
+    runs = []
+    for _ in range(repeat):
+        timer = _SqlTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            response = client.get(url)
+            wall = time.perf_counter() - started
+        runs.append((timer.queries, timer.seconds, wall))
+    queries, sql, wall = (sorted(values) for values in zip(*runs))
+    middle = len(runs) // 2
+    return response, {
+        'url': url,
+        'status': response.status_code,
+        'queries': queries[-1],
+        'sql_ms': round(sql[middle] * 1000, 3),
+        'wall_ms': round(wall[middle] * 1000, 3),
+    }
+
+
+def _thresholds(config):
+    thresholds = dict(config['regression_threshold'])
+    override = os.getenv('BENCH_TIME_THRESHOLD')
+    if override:
+        value = None if override == 'off' else float(override)
+        thresholds.update(sql_ms=value, wall_ms=value)
+    return thresholds
+
+
+def _check_regression(name, result, baseline, thresholds, slack_ms=0):
+    previous = baseline.get(name)
+    if not previous:
+        return []
+    problems = []
+    for metric, threshold in thresholds.items():
+        if threshold is None or metric not in previous:
+            continue
+        limit = previous[metric] * (1 + threshold)
+        if metric.endswith('_ms'):
+            limit += slack_ms
+        if result[metric] > limit:
+            problems.append(
+                f'{name}: {metric} = {result[metric]}, базовая линия'
+                f' {previous[metric]} (+{threshold:.0%} допустимо)'
+            )
+    return problems
+
+
+def _write_report(report, tmp_path):
+    report_path = Path(os.getenv('BENCH_REPORT') or tmp_path / 'bench.json')
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=2, sort_keys=True)
+    if os.getenv('BENCH_UPDATE_BASELINE') == '1':
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as fh:
+            json.dump(
+                {name: {metric: result[metric] for metric in METRICS}
+                 for name, result in report['routes'].items()},
+                fh, ensure_ascii=False, indent=2, sort_keys=True,
+            )
+            fh.write('\n')
+    return report_path
+
+
+def test_routes_within_query_budget(tmp_path):
+    config = _load_json(BUDGETS_PATH)
+    budgets = config['routes']
+    baseline = _load_json(BASELINE_PATH)
+    thresholds = _thresholds(config)
+    repeat = int(os.getenv('BENCH_REPEAT', '3'))
+    seeded = _seed(config['scale'])
+    clients = {'anonymous': Client(), 'author': Client()}
+    clients['author'].force_login(seeded['author'])
+
+    report = {'scale': os.getenv('BENCH_SCALE', '1'), 'routes': {}}
+    problems = []
+    for name, pattern in _iter_routes():
+        assert name in budgets, (
+            f"Добавьте бюджет запросов для маршрута `{name}` в"
+            f" `{BUDGETS_PATH.name}` (или null, чтобы пропустить его)."
+        )
+        budget = budgets[name]
+        if budget is None:
+            continue
+        kwargs = {
+            key: seeded['kwargs'][key] for key in pattern.pattern.converters
+        }
+        response, result = _measure(
+            clients[budget['client']], reverse(name, kwargs=kwargs), repeat)
+        report['routes'][name] = result
+        if response.status_code != 200:
+            problems.append(f'{name}: статус ответа {response.status_code}')
+        if result['queries'] > budget['queries']:
+            problems.append(
+                f"{name}: {result['queries']} SQL-запросов при бюджете"
+                f" {budget['queries']}"
+            )
+        problems += _check_regression(
+            name, result, baseline, thresholds,
+            config.get('regression_slack_ms', 0))
+
+    report_path = _write_report(report, tmp_path)
+    assert not problems, (
+        'Маршруты вышли за бюджет производительности (отчёт:'
+        f' {report_path}):\n' + '\n'.join(problems)
+    )
+
+
+def test_admin_changelist_within_budget(tmp_path):
+    config = _load_json(BUDGETS_PATH)['admin_changelist']
+    factor = float(os.getenv('BENCH_SCALE', '1'))
+    sizes = {
+        key: max(1, int(value * factor))
+        for key, value in config['scale'].items()
+    }
+    User = get_user_model()
+    users = _bulk_create(User, (
+        User(username=f'bench_admin_{i}', password='!')
+        for i in range(sizes['users'])
+    ))
+    category = Category.objects.create(
+        title='Категория', description='Описание', slug='bench-admin')
+    now = timezone.now()
+    Post.objects.bulk_create((
+        Post(title=f'Пост {i}', text='Текст', excerpt='Текст',
+             pub_date=now - timedelta(minutes=i),
+             author=users[i % len(users)], category=category)
+        for i in range(sizes['posts'])
+    ), batch_size=1000)
+    admin = User.objects.create_superuser('bench_admin', password='!')
+    client = Client()
+    client.force_login(admin)
+    url = reverse('admin:blog_post_changelist')
+    client.get(url)
+    response, result = _measure(client, url)
+
+    report_path = Path(
+        os.getenv('BENCH_REPORT') or tmp_path / 'bench.json')
+    report_path = report_path.with_name(f'{report_path.stem}_admin.json')
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as fh:
+        json.dump({'scale': sizes, **result}, fh, indent=2)
+    assert response.status_code == 200
+    assert result['queries'] <= config['queries'], (
+        f"Список постов в админке: {result['queries']} SQL-запросов при"
+        f" бюджете {config['queries']} (отчёт: {report_path})."
+    )
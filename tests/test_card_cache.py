@@ -0,0 +1,86 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import override_settings
+
+from blog import page_cache
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def card_cache():
+    cache.clear()
+    with override_settings(BLOG_CARD_CACHE_TIMEOUT=60):
+        yield
+    cache.clear()
+
+
+def test_unchanged_card_served_from_cache(
+        client, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+    Post.objects.filter(pk=post.pk).update(title='Заголовок мимо модели')
+    content = client.get('/').content.decode('utf-8')
+    assert post.title in content, (
+        "Убедитесь, что карточка неизменённого поста берётся из кеша"
+        " фрагментов."
+    )
+
+
+def test_saved_post_refreshes_card(client, post_with_published_location):
+    post = post_with_published_location
+    client.get('/')
+    post.title = 'Обновлённый заголовок'
+    post.save()
+    content = client.get('/').content.decode('utf-8')
+    assert 'Обновлённый заголовок' in content, (
+        "Убедитесь, что после сохранения поста его карточка"
+        " перерисовывается: в ключ кеша входит `updated_at`."
+    )
+
+
+def test_category_change_refreshes_card(
+        client, post_with_published_location):
+    category = post_with_published_location.category
+    client.get('/')
+    category.title = 'Новая категория'
+    category.save()
+    content = client.get('/').content.decode('utf-8')
+    assert 'Новая категория' in content, (
+        "Убедитесь, что изменение категории сбрасывает кеш карточек."
+    )
+
+
+def test_renamed_author_refreshes_card(
+        client, user, post_with_published_location):
+    client.get('/')
+    user.username = 'renamed_author'
+    user.save()
+    content = client.get('/').content.decode('utf-8')
+    assert '@renamed_author' in content, (
+        "Убедитесь, что смена имени автора перерисовывает его карточки."
+    )
+
+
+def test_generation_bump_from_another_process_refreshes_card(
+        client, settings, tmp_path, post_with_published_location):
+    # Два экземпляра файлового кеша в одном каталоге — как два процесса.
+    settings.CACHES = {**settings.CACHES, 'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    client.get('/')
+    category = post_with_published_location.category
+    Category.objects.filter(pk=category.pk).update(title='Из другого')
+    other_process = FileBasedCache(str(tmp_path), {})
+    with mock.patch('blog.page_cache.cache', other_process):
+        page_cache.bump(page_cache.GLOBAL_SCOPE)
+    content = client.get('/').content.decode('utf-8')
+    assert 'Из другого' in content, (
+        "Убедитесь, что карточки хранятся в общем кеше вместе с"
+        " поколениями и сбрасываются сдвигом из любого процесса."
+    )
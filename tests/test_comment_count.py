@@ -0,0 +1,92 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что при создании комментария счётчик `comment_count`"
+        " поста увеличивается."
+    )
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при удалении комментария счётчик `comment_count`"
+        " поста уменьшается."
+    )
+
+
+def test_stale_post_save_keeps_comment_count(
+        mixer, post_with_published_location):
+    stale_post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend(Comment, post=post_with_published_location)
+    stale_post.title = 'Новый заголовок'
+    stale_post.save()
+    stale_post.refresh_from_db()
+    assert stale_post.comment_count == 1, (
+        "Убедитесь, что сохранение поста не перезаписывает счётчик"
+        " комментариев устаревшим значением."
+    )
+
+
+def test_recount_comments_repairs_drift(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " фактическое число комментариев."
+    )
+
+
+@pytest.mark.parametrize('via_queryset', [False, True])
+def test_post_delete_skips_comment_recount(
+        mixer, post_with_published_location, via_queryset):
+    post = post_with_published_location
+    mixer.cycle(5).blend(Comment, post=post)
+    with CaptureQueriesContext(connection) as captured:
+        if via_queryset:
+            Post.objects.filter(pk=post.pk).delete()
+        else:
+            post.delete()
+    assert not [
+        query for query in captured.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ], (
+        "Убедитесь, что при удалении поста счётчик не пересчитывается для"
+        " каждого удаляемого каскадом комментария."
+    )
+
+
+def test_failed_post_delete_keeps_comment_recount(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend(Comment, post=post)
+
+    def fail(**kwargs):
+        raise RuntimeError('удаление прервано')
+
+    pre_delete.connect(fail, sender=Post)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=Post)
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что после неудачного удаления поста его комментарии"
+        " по-прежнему уменьшают счётчик."
+    )
@@ -0,0 +1,65 @@
+import re
+
+import pytest
+
+from blog.constants import COMMENTS_PAGINATE_COUNT
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+LOAD_MORE = re.compile(r'data-load-more="([^"]+)"')
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    return mixer.cycle(COMMENTS_PAGINATE_COUNT + 5).blend(
+        Comment, post=post_with_published_location, author=user)
+
+
+def _comment_ids(content):
+    return [int(pk) for pk in re.findall(r'name="comment_(\d+)"', content)]
+
+
+def test_detail_shows_first_page_of_comments(
+        client, post_with_published_location, many_comments):
+    response = client.get(f'/posts/{post_with_published_location.pk}/')
+    content = response.content.decode()
+    assert _comment_ids(content) == [
+        comment.pk for comment in many_comments[:COMMENTS_PAGINATE_COUNT]
+    ], (
+        "Убедитесь, что на странице поста выводится только первая порция"
+        " комментариев, от старых к новым."
+    )
+    assert LOAD_MORE.search(content), (
+        "Убедитесь, что под комментариями есть ссылка «Показать ещё»."
+    )
+
+
+def test_fragment_returns_next_batch(
+        client, post_with_published_location, many_comments):
+    response = client.get(f'/posts/{post_with_published_location.pk}/')
+    fragment_url = LOAD_MORE.search(response.content.decode()).group(1)
+    fragment = client.get(fragment_url.replace('&amp;', '&'))
+    assert fragment.status_code == 200
+    content = fragment.content.decode()
+    assert '<html' not in content, (
+        "Убедитесь, что следующая порция комментариев отдаётся фрагментом"
+        " HTML без основного шаблона."
+    )
+    assert _comment_ids(content) == [
+        comment.pk for comment in many_comments[COMMENTS_PAGINATE_COUNT:]
+    ]
+    assert not LOAD_MORE.search(content)
+
+
+def test_fragment_hides_comments_of_unpublished_post(
+        client, post_with_published_location, many_comments):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f'/posts/{post.pk}/comments/').status_code == 404
+
+
+def test_invalid_comment_cursor_is_404(client, post_with_published_location):
+    url = f'/posts/{post_with_published_location.pk}/comments/?cursor=xyz'
+    assert client.get(url).status_code == 404
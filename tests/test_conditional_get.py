@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def urls(post_with_published_location, published_category, user):
+    post = post_with_published_location
+    return {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+        'detail': f'/posts/{post.pk}/',
+    }
+
+
+@pytest.mark.parametrize('page', ['index', 'category', 'profile', 'detail'])
+def test_repeat_visit_gets_304_in_one_query(
+        client, django_assert_num_queries, urls, page):
+    first = client.get(urls[page])
+    assert first.has_header('ETag') and first.has_header('Last-Modified'), (
+        "Убедитесь, что ленты и страница поста отдают ETag и Last-Modified."
+    )
+    queries = 2 if page in ('category', 'profile') else 1
+    with django_assert_num_queries(queries):
+        second = client.get(
+            urls[page], HTTP_IF_NONE_MATCH=first['ETag'])
+    assert second.status_code == 304, (
+        "Убедитесь, что при неизменной странице возвращается 304 Not"
+        " Modified без рендеринга."
+    )
+
+
+def test_if_modified_since_gets_304(client, urls):
+    first = client.get(urls['index'])
+    second = client.get(
+        urls['index'], HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+    assert second.status_code == 304
+
+
+def test_unpublished_post_changes_last_modified(
+        client, mixer, user, published_category):
+    older, _ = mixer.cycle(2).blend(
+        Post, author=user, category=published_category, is_published=True,
+        pub_date=mixer.sequence(
+            timezone.now() - timedelta(days=1), timezone.now()))
+    last_modified = client.get('/')['Last-Modified']
+    # Last-Modified точен до секунды: снимаем пост «чуть позже».
+    with mock.patch('blog.page_cache.time.time',
+                    return_value=time.time() + 5):
+        older.is_published = False
+        older.save()
+    response = client.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200, (
+        "Убедитесь, что Last-Modified ленты меняется, когда с публикации"
+        " снимают не самый новый пост."
+    )
+
+
+def test_scheduled_post_changes_last_modified(
+        client, mixer, user, published_category):
+    now = timezone.now()
+    mixer.cycle(2).blend(
+        Post, author=user, category=published_category, is_published=True,
+        pub_date=mixer.sequence(
+            now - timedelta(days=1), now + timedelta(minutes=1)))
+    last_modified = client.get('/')['Last-Modified']
+    later = now + timedelta(minutes=2)
+    with mock.patch('django.utils.timezone.now', return_value=later):
+        response = client.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 200, (
+        "Убедитесь, что Last-Modified ленты меняется, когда наступает дата"
+        " отложенной публикации."
+    )
+
+
+@pytest.mark.parametrize('page', ['index', 'detail'])
+def test_new_comment_changes_etag(
+        client, mixer, user, urls, post_with_published_location, page):
+    etag = client.get(urls[page])['ETag']
+    mixer.blend(Comment, post=post_with_published_location, author=user)
+    response = client.get(urls[page], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после нового комментария страница отдаётся заново."
+    )
+    assert response['ETag'] != etag
+
+
+def test_edited_post_changes_etag(client, urls, post_with_published_location):
+    etag = client.get(urls['detail'])['ETag']
+    post = post_with_published_location
+    post.title = 'Новый заголовок'
+    post.save()
+    response = client.get(urls['detail'], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert 'Новый заголовок' in response.content.decode()
+
+
+def test_etag_differs_per_user(client, user_client, urls):
+    anonymous = client.get(urls['detail'])['ETag']
+    response = user_client.get(urls['detail'], HTTP_IF_NONE_MATCH=anonymous)
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag зависит от пользователя: автор видит на странице"
+        " кнопки, которых нет у анонимного читателя."
+    )
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=60)
+def test_cached_page_answers_304_without_queries(
+        client, django_assert_num_queries, urls):
+    etag = client.get(urls['index'])['ETag']
+    with django_assert_num_queries(0):
+        response = client.get(urls['index'], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+import pytest
+from conftest import N_PER_PAGE
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    # Часть постов делит одну дату публикации: ключ обязан различать их по id.
+    base_date = timezone.now() - timedelta(days=1)
+    pub_dates = (base_date - timedelta(hours=i // 3) for i in range(25))
+    return mixer.cycle(25).blend(
+        Post, author=user, category=published_category,
+        is_published=True, pub_date=pub_dates,
+    )
+
+
+def _walk(client, url, cursor, direction):
+    seen = []
+    while cursor is not None:
+        response = client.get(url, {'cursor': cursor})
+        assert response.status_code == 200
+        page = response.context['page_obj']
+        seen.append([post.pk for post in page])
+        cursor = (
+            page.next_cursor if direction == 'next' else page.previous_cursor)
+    return seen
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_cursor_pagination_walks_whole_feed(
+        client, many_posts, published_category, user, url_name):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    expected = list(
+        Post.objects.filter(pk__in=[post.pk for post in many_posts])
+        .order_by('-pub_date', '-pk').values_list('pk', flat=True)
+    )
+
+    pages = _walk(client, url, '', 'next')
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5], (
+        "Убедитесь, что курсорная пагинация отдаёт страницы по"
+        f" {N_PER_PAGE} постов."
+    )
+    assert sum(pages, []) == expected, (
+        "Убедитесь, что курсорная пагинация проходит ленту без пропусков"
+        " и повторов."
+    )
+
+    last_page = client.get(url, {'cursor': ''}).context['page_obj']
+    for _ in range(2):
+        last_page = client.get(
+            url, {'cursor': last_page.next_cursor}).context['page_obj']
+    back_pages = _walk(client, url, last_page.previous_cursor, 'previous')
+    assert back_pages == pages[-2::-1], (
+        "Убедитесь, что ссылки «назад» курсорной пагинации возвращают"
+        " предыдущие страницы."
+    )
+
+
+def test_invalid_cursor_returns_404(client):
+    response = client.get('/', {'cursor': 'not-a-cursor'})
+    assert response.status_code == 404, (
+        "Убедитесь, что некорректный курсор приводит к ответу 404."
+    )
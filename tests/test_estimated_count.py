@@ -0,0 +1,114 @@
+import pytest
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test import override_settings
+
+from blog.admin import CategoryAdmin, LocationAdmin, PostAdmin
+from blog.models import Post
+from blog.pagination import EstimatedCountPaginator, estimate_count
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        Post, author=user, category=published_category)
+
+
+@pytest.mark.skipif(
+    connection.vendor == 'postgresql', reason='Оценка по EXPLAIN.')
+def test_sqlite_count_is_cached(django_assert_num_queries, posts):
+    queryset = Post.objects.published()
+    assert estimate_count(queryset) == 5
+    with django_assert_num_queries(0):
+        assert estimate_count(Post.objects.published()) == 5, (
+            "Убедитесь, что оценка числа строк берётся из кеша."
+        )
+
+
+@override_settings(BLOG_ESTIMATED_COUNT_THRESHOLD=3)
+def test_large_sets_use_estimate(django_assert_num_queries, posts):
+    estimate_count(Post.objects.all())
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    queries = 2 if connection.vendor == 'postgresql' else 0
+    with django_assert_num_queries(queries):
+        assert paginator.num_pages == 3
+
+
+@override_settings(BLOG_ESTIMATED_COUNT_THRESHOLD=100)
+def test_small_sets_are_counted_exactly(posts):
+    estimate_count(Post.objects.all())
+    Post.objects.filter(pk=posts[0].pk).delete()
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    assert paginator.count == 4, (
+        "Убедитесь, что небольшие наборы строк считаются точно."
+    )
+
+
+@pytest.mark.parametrize('model_admin', [PostAdmin, CategoryAdmin,
+                                         LocationAdmin])
+def test_admins_use_estimated_paginator(model_admin):
+    assert model_admin.paginator is EstimatedCountPaginator
+    assert model_admin.show_full_result_count is False
+
+
+def test_post_changelist_renders(admin_client, post_with_published_location):
+    assert admin_client.get('/admin/blog/post/').status_code == 200
+
+
+@pytest.mark.skipif(
+    connection.vendor == 'postgresql', reason='Оценка по EXPLAIN.')
+def test_fresh_count_is_not_repeated(django_assert_num_queries, posts):
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    with django_assert_num_queries(1):
+        assert paginator.count == 5, (
+            "Убедитесь, что только что посчитанное число строк не"
+            " пересчитывается вторым COUNT(*)."
+        )
+
+
+@override_settings(BLOG_ESTIMATED_COUNT_THRESHOLD=100)
+def test_small_sets_skip_estimate(django_assert_num_queries, posts):
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    with django_assert_num_queries(1) as captured:
+        assert paginator.count == 5
+    assert 'EXPLAIN' not in captured.captured_queries[0]['sql'], (
+        "Убедитесь, что небольшие наборы строк считаются одним запросом"
+        " с LIMIT, без оценки планировщика."
+    )
+
+
+@override_settings(BLOG_ESTIMATED_COUNT_THRESHOLD=3)
+def test_low_estimate_keeps_real_pages(monkeypatch, posts):
+    monkeypatch.setattr(
+        'blog.pagination._estimate', lambda qs, compute=True: (3, False))
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    assert paginator.num_pages == 2
+    page = paginator.page(3)
+    assert list(page) == [posts[4]], (
+        "Убедитесь, что заниженная оценка не скрывает существующие"
+        " страницы."
+    )
+    assert paginator.count == 5
+    assert not page.has_next()
+
+
+@override_settings(BLOG_ESTIMATED_COUNT_THRESHOLD=3)
+def test_high_estimate_is_clamped(monkeypatch, posts):
+    monkeypatch.setattr(
+        'blog.pagination._estimate', lambda qs, compute=True: (100, False))
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    assert paginator.page(2).has_next()
+    assert len(paginator.page(3)) == 1
+    assert paginator.num_pages == 3
+    with pytest.raises(EmptyPage):
+        paginator.page(4)
@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(50))
+
+
+def test_excerpt_filled_on_save(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        "Убедитесь, что при сохранении поста поле `excerpt` заполняется"
+        " первыми словами текста."
+    )
+
+
+def test_feed_does_not_load_full_text(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as captured:
+        content = client.get('/').content.decode('utf-8')
+    post_queries = [
+        query['sql'] for query in captured.captured_queries
+        if 'FROM "blog_post"' in query['sql']
+        and 'COUNT(' not in query['sql']
+    ]
+    assert post_queries
+    assert all('"blog_post"."text"' not in sql for sql in post_queries), (
+        "Убедитесь, что лента не выбирает полный текст постов."
+    )
+    assert post_with_published_location.excerpt in content
+
+
+def test_backfill_excerpts(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(excerpt='', text=LONG_TEXT)
+    call_command('backfill_excerpts', batch_size=1)
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        "Убедитесь, что команда `backfill_excerpts` заполняет пустые анонсы."
+    )
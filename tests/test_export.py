@@ -0,0 +1,109 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blog_rows(mixer, user, published_category, published_location):
+    posts = mixer.cycle(3).blend(
+        Post, author=user, category=published_category,
+        location=published_location, renditions={})
+    for post in posts:
+        mixer.cycle(2).blend(Comment, post=post, author=user)
+    return posts
+
+
+def read_jsonl(paths):
+    records = []
+    for path in paths:
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8') as fh:
+            records.extend(json.loads(line) for line in fh)
+    return records
+
+
+def test_export_to_stdout_in_dumpdata_format(blog_rows):
+    out = io.StringIO()
+    call_command('export_blog', stdout=out, stderr=io.StringIO())
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    labels = [record['model'] for record in records]
+    assert labels == (
+        ['blog.category', 'blog.location'] + ['blog.post'] * 3
+        + ['blog.comment'] * 6
+    ), 'Убедитесь, что `export_blog` выгружает все строки блога.'
+    post = next(record for record in records if record['model'] == 'blog.post')
+    assert post['fields']['author'] == blog_rows[0].author_id, (
+        'Убедитесь, что внешние ключи выгружаются как в `dumpdata`.'
+    )
+
+
+def test_gzip_export_loads_back_with_fastload(blog_rows, tmp_path):
+    call_command('export_blog', output=tmp_path / 'blog.jsonl', compress=True,
+                 stdout=io.StringIO())
+    path = tmp_path / 'blog.jsonl.gz'
+    assert path.exists(), 'Убедитесь, что `--gzip` пишет `.jsonl.gz`.'
+    titles = sorted(Post.objects.values_list('title', flat=True))
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    call_command('fastload', path, stdout=io.StringIO())
+    assert sorted(Post.objects.values_list('title', flat=True)) == titles
+    assert Comment.objects.count() == 6
+    assert set(Post.objects.values_list('comment_count', flat=True)) == {2}
+
+
+def test_split_by_size(blog_rows, tmp_path):
+    out = io.StringIO()
+    call_command('export_blog', output=tmp_path / 'blog.jsonl',
+                 max_bytes=300, stdout=out)
+    paths = sorted(tmp_path.glob('blog-*.jsonl'))
+    assert len(paths) > 1, (
+        'Убедитесь, что `--max-bytes` разбивает выгрузку на файлы.'
+    )
+    assert len(read_jsonl(paths)) == 11
+    assert all(path.stat().st_size < 300 + 1024 for path in paths)
+    assert str(paths[0]) in out.getvalue()
+
+
+def test_incremental_export_with_state(blog_rows, mixer, user, tmp_path):
+    state = tmp_path / 'state.json'
+    call_command('export_blog', output=tmp_path / 'full.jsonl', state=state,
+                 stdout=io.StringIO())
+    assert len(read_jsonl([tmp_path / 'full.jsonl'])) == 11
+    assert json.loads(state.read_text())['models']['blog.post'] == (
+        blog_rows[-1].pk)
+
+    edited = blog_rows[0]
+    edited.title = 'Исправленный заголовок'
+    edited.save()
+    new_comment = mixer.blend(Comment, post=blog_rows[1], author=user)
+    call_command('export_blog', output=tmp_path / 'delta.jsonl', state=state,
+                 stdout=io.StringIO())
+    records = read_jsonl([tmp_path / 'delta.jsonl'])
+    exported = {(record['model'], record['pk']) for record in records}
+    assert ('blog.post', edited.pk) in exported, (
+        'Убедитесь, что повторная выгрузка забирает изменённые посты.'
+    )
+    assert ('blog.comment', new_comment.pk) in exported, (
+        'Убедитесь, что повторная выгрузка забирает новые строки.'
+    )
+    assert len([
+        label for label, _ in exported if label == 'blog.comment']) == 1, (
+        'Убедитесь, что повторная выгрузка не повторяет старые строки.'
+    )
+
+
+def test_after_id_for_single_model(blog_rows):
+    out = io.StringIO()
+    call_command('export_blog', labels=['blog.post'],
+                 after_id=blog_rows[0].pk, stdout=out, stderr=io.StringIO())
+    pks = [json.loads(line)['pk'] for line in out.getvalue().splitlines()]
+    assert pks == [post.pk for post in blog_rows[1:]]
@@ -0,0 +1,199 @@
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from django.db import connection
+
+from blog.fastload import FixtureError, iter_records
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+CREATED_AT = '2020-01-02T03:04:05Z'
+
+
+def dump_records():
+    # Порядок нарочно обратный зависимостям внешних ключей.
+    return [
+        {'model': 'blog.comment', 'pk': 1, 'fields': {
+            'post': 1, 'author': 1, 'text': 'Первый',
+            'created_at': CREATED_AT}},
+        {'model': 'blog.comment', 'pk': 2, 'fields': {
+            'post': 1, 'author': 1, 'text': 'Второй',
+            'created_at': CREATED_AT}},
+        {'model': 'blog.post', 'pk': 1, 'fields': {
+            'title': 'Пост', 'text': 'Текст поста', 'pub_date': CREATED_AT,
+            'author': 1, 'category': 1, 'location': 1,
+            'created_at': CREATED_AT}},
+        {'model': 'auth.user', 'pk': 1, 'fields': {
+            'username': 'reader', 'password': '!', 'groups': []}},
+        {'model': 'blog.location', 'pk': 1, 'fields': {
+            'name': 'Место', 'created_at': CREATED_AT}},
+        {'model': 'blog.category', 'pk': 1, 'fields': {
+            'title': 'Категория', 'description': 'Описание',
+            'slug': 'cat', 'created_at': CREATED_AT}},
+        {'model': 'sessions.session', 'pk': 'x', 'fields': {}},
+    ]
+
+
+@pytest.fixture
+def jsonl_gz(tmp_path):
+    path = tmp_path / 'dump.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as fh:
+        for record in dump_records():
+            fh.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('text', [
+    '[{"a": 1}, {"a": 2}]',
+    '{"a": 1}\n{"a": 2}\n',
+    '  [\n{"a": 1},\n{"a": 2}\n]\n',
+])
+def test_iter_records_streams_small_chunks(text):
+    records = list(iter_records(io.StringIO(text), chunk_size=3))
+    assert records == [{'a': 1}, {'a': 2}], (
+        'Убедитесь, что записи JSON-массива и JSONL читаются по частям.'
+    )
+
+
+@pytest.mark.parametrize('text', ['[{"a": 1}', '[{"a": 1}] {"a": 2}'])
+def test_iter_records_rejects_broken_input(text):
+    with pytest.raises(FixtureError):
+        list(iter_records(io.StringIO(text), chunk_size=4))
+
+
+def test_loads_project_fixture():
+    source = json.loads(
+        (settings.BASE_DIR / 'db.json').read_text(encoding='utf-8'))
+    expected = {
+        model: sum(1 for record in source if record['model'] == label)
+        for model, label in [
+            (Category, 'blog.category'), (Location, 'blog.location'),
+            (get_user_model(), 'auth.user'), (Post, 'blog.post'),
+        ]
+    }
+    call_command('fastload', settings.BASE_DIR / 'db.json',
+                 stdout=io.StringIO())
+    for model, count in expected.items():
+        assert model.objects.count() == count, (
+            f'Убедитесь, что `fastload` загружает все записи {model.__name__}'
+            ' из `db.json`.'
+        )
+    assert not Post.objects.filter(excerpt='').exists(), (
+        'Убедитесь, что `fastload` заполняет анонсы постов.'
+    )
+
+
+def test_loads_gzip_jsonl_in_fk_order(jsonl_gz):
+    out = io.StringIO()
+    call_command('fastload', jsonl_gz, batch_size=1, stdout=out)
+    post = Post.objects.get()
+    assert post.comment_count == 2, (
+        'Убедитесь, что после загрузки пересчитывается число комментариев.'
+    )
+    expected = datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert post.created_at == expected, (
+        'Убедитесь, что `fastload` сохраняет даты создания из дампа.'
+    )
+    assert Comment.objects.filter(created_at=expected).count() == 2
+    assert 'строк/с' in out.getvalue(), (
+        'Убедитесь, что `fastload` сообщает скорость загрузки.'
+    )
+    assert 'sessions.session: пропущено 1' in out.getvalue()
+
+
+def test_new_rows_get_fresh_pk_after_load(jsonl_gz):
+    call_command('fastload', jsonl_gz, stdout=io.StringIO())
+    category = Category.objects.create(
+        title='Новая', description='Описание', slug='new')
+    assert category.pk > 1
+
+
+def test_ignore_conflicts_skips_existing_rows(jsonl_gz):
+    call_command('fastload', jsonl_gz, stdout=io.StringIO())
+    call_command('fastload', jsonl_gz, ignore_conflicts=True,
+                 stdout=io.StringIO())
+    assert Comment.objects.count() == 2
+    assert Post.objects.get().comment_count == 2
+
+
+def test_user_relations_follow_natural_keys(tmp_path):
+    decoy_group = Group.objects.create(name='Случайная')
+    group = Group.objects.create(name='Редакторы')
+    permission = Permission.objects.get(codename='add_post')
+    decoy_permission = Permission.objects.get(codename='delete_comment')
+    # В исходной базе номера групп и прав другие: под номерами из дампа в
+    # этой базе лежат совсем другие строки.
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps([
+        {'model': 'auth.user', 'pk': 1, 'fields': {
+            'username': 'editor', 'password': '!',
+            'groups': [decoy_group.pk],
+            'user_permissions': [decoy_permission.pk, 999]}},
+        {'model': 'auth.group', 'pk': decoy_group.pk, 'fields': {
+            'name': 'Редакторы', 'permissions': []}},
+        {'model': 'auth.permission', 'pk': decoy_permission.pk, 'fields': {
+            'name': 'Can add post', 'content_type': 70,
+            'codename': 'add_post'}},
+        {'model': 'contenttypes.contenttype', 'pk': 70, 'fields': {
+            'app_label': 'blog', 'model': 'post'}},
+        {'model': 'auth.permission', 'pk': 999, 'fields': {
+            'name': 'Can view post', 'content_type': 71,
+            'codename': 'view_post'}},
+    ]), encoding='utf-8')
+    out = io.StringIO()
+    call_command('fastload', path, stdout=out)
+    editor = get_user_model().objects.get(username='editor')
+    assert list(editor.groups.all()) == [group], (
+        'Убедитесь, что `fastload` находит группы по имени, а не по номеру'
+        ' из дампа.'
+    )
+    assert list(editor.user_permissions.all()) == [permission], (
+        'Убедитесь, что `fastload` находит права по коду и типу'
+        ' содержимого, а не по номеру из дампа.'
+    )
+    assert 'auth.user_user_permissions: пропущено 1' in out.getvalue(), (
+        'Убедитесь, что `fastload` сообщает о связях, которые не удалось'
+        ' перенести.'
+    )
+
+
+def test_user_relations_accept_natural_keys(tmp_path):
+    group = Group.objects.create(name='Редакторы')
+    path = tmp_path / 'users.json'
+    path.write_text(json.dumps([
+        {'model': 'auth.user', 'pk': 1, 'fields': {
+            'username': 'editor', 'password': '!',
+            'groups': [['Редакторы'], ['Нет такой']],
+            'user_permissions': [['add_post', 'blog', 'post']]}},
+    ]), encoding='utf-8')
+    out = io.StringIO()
+    call_command('fastload', path, stdout=out)
+    editor = get_user_model().objects.get(username='editor')
+    assert list(editor.groups.all()) == [group]
+    assert editor.user_permissions.get().codename == 'add_post'
+    assert 'auth.user_groups: пропущено 1' in out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_drop_indexes_restores_indexes(jsonl_gz):
+    def index_names():
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table)
+        return {name for name, info in constraints.items() if info['index']}
+
+    before = index_names()
+    call_command('fastload', jsonl_gz, drop_indexes=True,
+                 stdout=io.StringIO())
+    assert Post.objects.count() == 1
+    assert index_names() == before, (
+        'Убедитесь, что `fastload --drop-indexes` возвращает индексы.'
+    )
@@ -0,0 +1,142 @@
+import io
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.loadtest import parse_mix, summarize
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(5).blend(
+        Post, author=user, category=published_category, is_published=True,
+        renditions={})
+
+
+def test_summarize_percentiles_per_route():
+    samples = [
+        ('blog:index', False, 200, latency / 1000)
+        for latency in range(1, 101)
+    ] + [('blog:add_comment', True, 403, 0.5)]
+    report = summarize(samples, elapsed=2.0)
+    index = report['routes']['blog:index [anon]']
+    assert index['requests'] == 100
+    assert index['rps'] == 50
+    assert (index['p50_ms'], index['p95_ms'], index['p99_ms']) == (
+        50, 95, 99), 'Убедитесь, что перцентили считаются по маршруту.'
+    assert report['routes']['blog:add_comment [auth]']['errors'] == 1
+    assert report['total']['requests'] == 101
+    assert report['total']['errors'] == 1
+
+
+def test_parse_mix_rejects_unknown_route():
+    assert parse_mix('blog:index=3,blog:profile') == {
+        'blog:index': 3.0, 'blog:profile': 1.0}
+    with pytest.raises(ValueError):
+        parse_mix('blog:unknown=1')
+
+
+def test_in_process_run_reports_routes(posts, tmp_path):
+    output = tmp_path / 'report.json'
+    out = io.StringIO()
+    # Вход пишет в django_session, а общая база SQLite в памяти не допускает
+    # параллельной записи.
+    call_command(
+        'loadtest', requests=40, concurrency=1, warmup=0, output=output,
+        mix={'blog:index': 1, 'blog:post_detail': 1, 'blog:profile': 1},
+        stdout=out,
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['total']['requests'] == 40, (
+        'Убедитесь, что `loadtest` отправляет заданное число запросов.'
+    )
+    assert report['total']['errors'] == 0
+    routes = {name.split()[0] for name in report['routes']}
+    assert routes == {'blog:index', 'blog:post_detail', 'blog:profile'}
+    clients = {name.split()[1] for name in report['routes']}
+    assert clients == {'[anon]', '[auth]'}, (
+        'Убедитесь, что смесь включает анонимные и авторизованные запросы.'
+    )
+    for values in report['routes'].values():
+        assert values['p50_ms'] <= values['p95_ms'] <= values['p99_ms']
+    assert report['meta']['target'] == 'in-process'
+    assert 'всего' in out.getvalue()
+
+
+def test_asgi_run_reports_routes(posts, tmp_path):
+    output = tmp_path / 'report.json'
+    # Синхронные view под ASGI выполняются в одном потоке, так что запись
+    # сессий не конкурирует даже при нескольких задачах.
+    call_command(
+        'loadtest', asgi=True, requests=30, concurrency=3, warmup=0,
+        output=output, stdout=io.StringIO(),
+        mix={'blog:index': 1, 'blog:post_detail': 1},
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['total']['requests'] == 30, (
+        'Убедитесь, что `loadtest --asgi` отправляет запросы через'
+        ' ASGI-обработчик.'
+    )
+    assert report['total']['errors'] == 0
+    assert {name.split()[1] for name in report['routes']} == {
+        '[anon]', '[auth]'}
+    assert report['meta']['interface'] == 'asgi'
+
+
+@pytest.mark.parametrize('asgi', [False, True])
+def test_view_exception_counts_as_error(posts, tmp_path, asgi):
+    output = tmp_path / 'report.json'
+    with mock.patch('blog.views.PostDetailView.get',
+                    side_effect=RuntimeError('сбой')):
+        call_command(
+            'loadtest', requests=6, concurrency=1, warmup=0, users=0,
+            asgi=asgi,
+            output=output, stdout=io.StringIO(),
+            mix={'blog:index': 1, 'blog:post_detail': 1},
+        )
+    routes = json.loads(output.read_text(encoding='utf-8'))['routes']
+    detail = routes['blog:post_detail [anon]']
+    assert detail['errors'] == detail['requests'] > 0, (
+        'Убедитесь, что исключение во view даёт ответ 500 и считается'
+        ' ошибкой, а не прерывает прогон.'
+    )
+    assert routes['blog:index [anon]']['errors'] == 0
+
+
+def test_comment_scenario_creates_comments(posts, tmp_path):
+    output = tmp_path / 'report.json'
+    # Общая база SQLite в памяти не допускает параллельной записи.
+    call_command(
+        'loadtest', requests=5, concurrency=1, warmup=0, output=output,
+        mix={'blog:add_comment': 1}, stdout=io.StringIO(),
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['routes']['blog:add_comment [auth]']['errors'] == 0
+    assert Comment.objects.count() == 5, (
+        'Убедитесь, что сценарий комментария действительно их создаёт.'
+    )
+
+
+def test_table_compares_with_baseline(posts, tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    options = {
+        'requests': 10, 'concurrency': 1, 'warmup': 0, 'users': 0,
+        'mix': {'blog:index': 1},
+    }
+    call_command('loadtest', output=baseline, stdout=io.StringIO(),
+                 **options)
+    out = io.StringIO()
+    call_command('loadtest', baseline=baseline, stdout=out, **options)
+    assert 'Δ rps' in out.getvalue(), (
+        'Убедитесь, что `loadtest --baseline` сравнивает прогоны.'
+    )
+
+
+def test_requires_published_posts():
+    with pytest.raises(CommandError):
+        call_command('loadtest', requests=1, stdout=io.StringIO())
@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, override_settings
+
+from blog.models import Comment
+from core.nplusone import NPlusOneMiddleware, NPlusOneQueries
+
+pytestmark = [pytest.mark.django_db]
+
+TEMPLATE = engines['django'].from_string(
+    '{% for comment in comments %}\n'
+    '{{ comment.author.username }}\n'
+    '{% endfor %}'
+)
+
+
+@pytest.fixture
+def comments(mixer, post_with_published_location):
+    return mixer.cycle(4).blend(Comment, post=post_with_published_location)
+
+
+def _middleware(queryset):
+    def view(request):
+        return HttpResponse(TEMPLATE.render({'comments': queryset}))
+
+    return NPlusOneMiddleware(view)
+
+
+def test_lazy_loads_in_template_raise(comments):
+    middleware = _middleware(Comment.objects.all())
+    with pytest.raises(NPlusOneQueries) as error:
+        middleware(RequestFactory().get('/'))
+    message = str(error.value)
+    assert 'auth_user' in message
+    assert 'строка 2' in message, (
+        "Убедитесь, что детектор N+1 называет строку шаблона, из которой"
+        " пришла ленивая загрузка."
+    )
+
+
+def test_select_related_passes(comments):
+    middleware = _middleware(Comment.objects.select_related('author'))
+    assert middleware(RequestFactory().get('/')).status_code == 200
+
+
+@override_settings(NPLUSONE_MODE='log')
+def test_log_mode_warns(comments, caplog):
+    middleware = _middleware(Comment.objects.all())
+    with caplog.at_level(logging.WARNING, logger='core.nplusone'):
+        response = middleware(RequestFactory().get('/'))
+    assert response.status_code == 200
+    assert 'одинаковых запросов' in caplog.text, (
+        "Убедитесь, что в режиме `log` детектор N+1 пишет предупреждение."
+    )
+
+
+@override_settings(NPLUSONE_MODE='off')
+def test_off_mode_is_silent(comments):
+    middleware = _middleware(Comment.objects.all())
+    assert middleware(RequestFactory().get('/')).status_code == 200
@@ -0,0 +1,149 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from blog import page_cache as blog_page_cache
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def page_cache():
+    cache.clear()
+    with override_settings(BLOG_PAGE_CACHE_TIMEOUT=60):
+        yield
+    cache.clear()
+
+
+def _is_cached(client, url, django_assert_num_queries):
+    try:
+        with django_assert_num_queries(0):
+            client.get(url)
+    except pytest.fail.Exception:
+        return False
+    return True
+
+
+def test_anonymous_page_is_cached(
+        client, django_assert_num_queries, post_with_published_location):
+    first = client.get('/')
+    with django_assert_num_queries(0):
+        second = client.get('/')
+    assert second.content == first.content, (
+        "Убедитесь, что анонимный читатель получает страницу из кеша."
+    )
+
+
+def test_logged_in_user_bypasses_cache(
+        user_client, django_assert_num_queries, post_with_published_location):
+    user_client.get('/')
+    assert not _is_cached(user_client, '/', django_assert_num_queries), (
+        "Убедитесь, что страницы авторизованных пользователей не кешируются."
+    )
+
+
+def test_comment_invalidates_only_affected_pages(
+        client, mixer, user, django_assert_num_queries,
+        post_with_published_location, post_with_another_category,
+        another_category):
+    post = post_with_published_location
+    urls = {
+        'detail': f'/posts/{post.pk}/',
+        'index': '/',
+        'category': f'/category/{post.category.slug}/',
+        'other_category': f'/category/{another_category.slug}/',
+    }
+    for url in urls.values():
+        client.get(url)
+
+    mixer.blend(Comment, post=post, author=user)
+
+    for name in ('detail', 'index', 'category'):
+        assert not _is_cached(client, urls[name], django_assert_num_queries), (
+            "Убедитесь, что новый комментарий сбрасывает кеш страниц,"
+            f" где виден пост ({name})."
+        )
+    assert _is_cached(
+        client, urls['other_category'], django_assert_num_queries), (
+        "Убедитесь, что кеш страниц, не связанных с постом, не сбрасывается."
+    )
+
+
+def test_renamed_user_invalidates_only_own_pages(
+        client, mixer, user, another_user, another_category,
+        django_assert_num_queries, post_with_published_location):
+    post = post_with_published_location
+    other = mixer.blend(Post, author=another_user, category=another_category,
+                        is_published=True)
+    commented = mixer.blend(Post, author=another_user, is_published=True,
+                            category=another_category)
+    mixer.blend(Comment, post=commented, author=user)
+    urls = {
+        'detail': f'/posts/{post.pk}/',
+        'commented': f'/posts/{commented.pk}/',
+        'index': '/',
+        'category': f'/category/{post.category.slug}/',
+    }
+    untouched = {
+        'other_detail': f'/posts/{other.pk}/',
+        'other_profile': f'/profile/{another_user.username}/',
+    }
+    for url in [*urls.values(), *untouched.values()]:
+        client.get(url)
+
+    user.username = 'renamed'
+    user.save()
+
+    for name, url in urls.items():
+        assert not _is_cached(client, url, django_assert_num_queries), (
+            "Убедитесь, что смена имени пользователя сбрасывает кеш"
+            f" страниц, где оно выводится ({name})."
+        )
+    for name, url in untouched.items():
+        assert _is_cached(client, url, django_assert_num_queries), (
+            "Убедитесь, что сохранение пользователя не сбрасывает кеш"
+            f" всего сайта ({name})."
+        )
+    assert 'renamed' in client.get('/').content.decode('utf-8')
+
+
+def test_profile_edit_invalidates_only_profile(
+        client, user, django_assert_num_queries,
+        post_with_published_location):
+    profile = f'/profile/{user.username}/'
+    client.get('/')
+    client.get(profile)
+    user.first_name = 'Новое имя'
+    user.save()
+    assert not _is_cached(client, profile, django_assert_num_queries)
+    assert _is_cached(client, '/', django_assert_num_queries), (
+        "Убедитесь, что смена имени и фамилии не сбрасывает кеш ленты."
+    )
+
+
+def test_cache_expires_with_time_bucket(
+        client, monkeypatch, django_assert_num_queries,
+        post_with_published_location):
+    client.get('/')
+    later = time.time() + 60
+    monkeypatch.setattr('blog.page_cache.time.time', lambda: later)
+    assert not _is_cached(client, '/', django_assert_num_queries), (
+        "Убедитесь, что ключ кеша меняется с интервалом времени, чтобы"
+        " отложенные посты появлялись вовремя."
+    )
+
+
+def test_lost_generation_is_not_reset_to_zero():
+    scopes = ['index', 'post:1']
+    first = blog_page_cache.generations(scopes)
+    assert 0 not in first, (
+        "Убедитесь, что пропавшее из кеша поколение заводится новым"
+        " значением, а не нулём."
+    )
+    assert blog_page_cache.generations(scopes) == first
+    blog_page_cache.bump('index')
+    index, post = blog_page_cache.generations(scopes)
+    assert index != first[0] and post == first[1]
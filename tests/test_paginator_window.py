@@ -0,0 +1,58 @@
+import re
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.constants import PAGINATE_COUNT
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+PAGES = 12
+
+
+@pytest.fixture
+def many_pages(user, published_category):
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', author=user,
+             category=published_category,
+             pub_date=now - timezone.timedelta(minutes=i))
+        for i in range(PAGES * PAGINATE_COUNT)
+    )
+
+
+def _page_links(content):
+    return [int(number) for number in re.findall(r'\?page=(\d+)">\s*\d+',
+                                                 content)]
+
+
+def test_page_range_is_windowed(client, many_pages):
+    content = client.get('/?page=6').content.decode()
+    assert _page_links(content) == [1, 4, 5, 7, 8, PAGES], (
+        "Убедитесь, что навигация выводит первую и последнюю страницы и"
+        " окно вокруг текущей, а не все номера страниц."
+    )
+    assert content.count('…') == 2
+
+
+def test_short_feed_lists_every_page(client, post_with_published_location):
+    response = client.get('/')
+    assert list(response.context['page_range']) == [1]
+
+
+@override_settings(
+    BLOG_FEED_STATE_TIMEOUT=60, BLOG_ESTIMATED_COUNT_THRESHOLD=PAGINATE_COUNT)
+def test_cached_feed_state_skips_count(
+        client, django_assert_num_queries, many_pages):
+    cache.clear()
+    client.get('/')
+    with django_assert_num_queries(1):
+        response = client.get('/?page=3')
+    assert response.context['paginator'].num_pages == PAGES, (
+        "Убедитесь, что при кешированном числе постов лента не выполняет"
+        " COUNT(*) и показывает верное число страниц."
+    )
+    cache.clear()
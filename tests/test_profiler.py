@@ -0,0 +1,68 @@
+import json
+import re
+
+import pytest
+from django.test import override_settings
+
+from core.profiling import collect_stats
+
+pytestmark = [pytest.mark.django_db]
+
+TIMING = re.compile(r'(\w+);dur=([\d.]+)')
+
+
+@pytest.fixture
+def sample_log(tmp_path):
+    path = tmp_path / 'requests.jsonl'
+    with override_settings(PROFILER_SAMPLE_RATE=1, PROFILER_LOG_PATH=path):
+        yield path
+
+
+def test_server_timing_header(client, post_with_published_location):
+    response = client.get(f'/posts/{post_with_published_location.pk}/')
+    assert response.has_header('Server-Timing'), (
+        "Убедитесь, что ответ содержит заголовок `Server-Timing`."
+    )
+    timings = dict(TIMING.findall(response['Server-Timing']))
+    assert set(timings) == {'sql', 'view', 'render', 'total'}
+    assert '2 SQL' in response['Server-Timing'], (
+        "Убедитесь, что в `Server-Timing` указано число SQL-запросов."
+    )
+    assert float(timings['total']) >= float(timings['render'])
+
+
+def test_sampled_requests_are_logged(client, sample_log):
+    client.get('/')
+    client.get('/pages/about/')
+    records = [
+        json.loads(line)
+        for line in sample_log.read_text(encoding='utf-8').splitlines()
+    ]
+    assert [record['route'] for record in records] == [
+        'blog:index', 'pages:about'], (
+        "Убедитесь, что выбранные запросы пишутся в журнал с именем маршрута."
+    )
+    assert records[0]['sql_count'] >= 1
+
+
+def test_collect_stats_percentiles():
+    samples = [
+        {'route': 'blog:index', 'total_ms': value, 'sql_count': 2}
+        for value in range(1, 101)
+    ]
+    stats = collect_stats(samples)['blog:index']
+    assert stats['count'] == 100
+    assert stats['total_ms'] == {'p50': 50, 'p95': 95, 'p99': 99}
+
+
+def test_stats_endpoint_is_staff_only(
+        client, user_client, admin_client, sample_log):
+    client.get('/')
+    assert client.get('/admin/profiler/').status_code == 302
+    assert user_client.get('/admin/profiler/').status_code == 302, (
+        "Убедитесь, что статистика профилировщика доступна только"
+        " сотрудникам."
+    )
+    response = admin_client.get('/admin/profiler/')
+    assert response.status_code == 200
+    assert 'blog:index' in response.json()['routes']
@@ -0,0 +1,102 @@
+import pytest
+from conftest import N_PER_PAGE
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+# Запросы страницы: дата последнего поста для валидаторов, COUNT(*)
+# пагинатора и выборка постов с JOIN; категорийной ленте и профилю нужен
+# ещё один запрос за категорией/автором.
+FEED_QUERIES = {'index': 3, 'category': 4, 'profile': 4}
+
+
+@pytest.fixture
+def full_feed(mixer, user, published_category, published_locations):
+    posts = mixer.cycle(N_PER_PAGE + 2).blend(
+        Post, author=user, category=published_category, is_published=True,
+        location=mixer.sequence(*published_locations),
+    )
+    for post in posts:
+        mixer.cycle(2).blend(Comment, post=post)
+    return posts
+
+
+@pytest.mark.parametrize('page', list(FEED_QUERIES))
+def test_feed_query_count_is_fixed(
+        client, django_assert_num_queries, full_feed, published_category,
+        user, page):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[page]
+    with django_assert_num_queries(FEED_QUERIES[page]):
+        response = client.get(url)
+    assert len(response.context['page_obj']) == N_PER_PAGE
+
+
+def test_post_detail_query_count_is_fixed(
+        client, django_assert_num_queries, full_feed):
+    # Пост с автором, местом и категорией одним запросом и комментарии.
+    with django_assert_num_queries(2):
+        response = client.get(f'/posts/{full_feed[0].pk}/')
+    assert response.status_code == 200
+
+
+def _selects_from(captured, table):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.fixture
+def owned_urls(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend(Comment, post=post, author=user)
+    return {
+        'edit_post': (f'/posts/{post.pk}/edit/', 'blog_post'),
+        'delete_post': (f'/posts/{post.pk}/delete/', 'blog_post'),
+        'edit_comment': (
+            f'/posts/{comment.post_id}/edit_comment/{comment.pk}/',
+            'blog_comment'),
+        'delete_comment': (
+            f'/posts/{comment.post_id}/delete/{comment.pk}/',
+            'blog_comment'),
+    }
+
+
+@pytest.mark.parametrize(
+    'route', ['edit_post', 'delete_post', 'edit_comment', 'delete_comment'])
+@pytest.mark.parametrize('as_owner', [True, False])
+def test_owner_views_fetch_object_once(
+        user_client, another_user_client, owned_urls, route, as_owner):
+    url, table = owned_urls[route]
+    client = user_client if as_owner else another_user_client
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == (200 if as_owner else (
+        302 if route == 'edit_post' else 404))
+    assert len(_selects_from(captured, table)) == 1, (
+        "Убедитесь, что страницы редактирования и удаления загружают объект"
+        " из базы один раз за запрос: и для проверки прав, и для формы."
+    )
+
+
+def test_unpublished_post_detail_visible_to_author_only(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    url = f'/posts/{post.pk}/'
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert len(_selects_from(captured, 'blog_post')) == 1, (
+        "Убедитесь, что пост, его автор, категория и местоположение"
+        " загружаются на странице поста одним запросом."
+    )
+    assert another_user_client.get(url).status_code == 404
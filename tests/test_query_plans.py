@@ -0,0 +1,70 @@
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.models import Comment
+from blog.views import CategoryListView, PostListView, UserListView
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN_PATTERNS = {
+    # SQLite: «SCAN blog_post» без «USING INDEX» — полный проход таблицы.
+    'sqlite': r'\bSCAN (TABLE )?{table}\b(?! USING (COVERING )?INDEX)',
+    'postgresql': r'Seq Scan on {table}\b',
+}
+
+
+@pytest.fixture
+def planner():
+    if connection.vendor not in FULL_SCAN_PATTERNS:
+        pytest.skip(f'Нет проверки планов для {connection.vendor}.')
+    if connection.vendor == 'postgresql':
+        # На крошечной тестовой таблице PostgreSQL всегда выбрал бы Seq Scan.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+
+def _make_view(view_class, user=None, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user or AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view
+
+
+def _assert_uses_index(queryset, table):
+    plan = queryset.explain()
+    pattern = FULL_SCAN_PATTERNS[connection.vendor].format(table=table)
+    assert not re.search(pattern, plan), (
+        f"Убедитесь, что запрос к `{table}` использует индекс, а не полный"
+        f" просмотр таблицы. План запроса:\n{plan}"
+    )
+
+
+def test_index_feed_uses_index(planner):
+    view = _make_view(PostListView)
+    _assert_uses_index(view.get_queryset(), 'blog_post')
+
+
+def test_category_feed_uses_index(planner, published_category):
+    view = _make_view(
+        CategoryListView, category_slug=published_category.slug)
+    view.category = published_category
+    _assert_uses_index(view.get_queryset(), 'blog_post')
+
+
+@pytest.mark.parametrize('is_owner', [False, True])
+def test_profile_feed_uses_index(planner, user, is_owner):
+    view = _make_view(
+        UserListView, user=user if is_owner else None,
+        username=user.username)
+    _assert_uses_index(view.get_queryset(), 'blog_post')
+
+
+def test_post_comments_use_index(planner, post_with_published_location):
+    comments = Comment.objects.filter(
+        post=post_with_published_location).order_by('created_at')
+    _assert_uses_index(comments, 'blog_comment')
@@ -0,0 +1,97 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+
+from blog.models import Post
+from blog.renditions import RENDITIONS
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path, TASKS_ALWAYS_EAGER=True):
+        yield tmp_path
+
+
+def _photo(width=2000, height=1500):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'lightskyblue').save(buffer, 'JPEG')
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), 'image/jpeg')
+
+
+def test_upload_builds_renditions(media_root, post_with_published_location):
+    post = post_with_published_location
+    post.image = _photo()
+    post.save()
+    post.refresh_from_db()
+    variants = post.renditions['variants']
+    assert set(variants) == set(RENDITIONS), (
+        "Убедитесь, что при загрузке изображения готовятся все копии."
+    )
+    for name, width in RENDITIONS.items():
+        assert variants[name]['width'] == width
+        assert (media_root / variants[name]['webp']).exists()
+        assert (media_root / variants[name]['fallback']).exists()
+
+
+def test_card_uses_srcset(client, post_with_published_location):
+    post = post_with_published_location
+    post.image = _photo()
+    post.save()
+    content = client.get('/').content.decode('utf-8')
+    assert 'srcset=' in content and 'loading="lazy"' in content, (
+        "Убедитесь, что карточка поста выводит изображение через `srcset`"
+        " с ленивой загрузкой."
+    )
+    assert 'image/webp' in content
+
+
+def test_build_renditions_backfills(post_with_published_location):
+    post = post_with_published_location
+    post.image = _photo(300, 200)
+    post.save()
+    Post.objects.filter(pk=post.pk).update(renditions={})
+    call_command('build_renditions')
+    post.refresh_from_db()
+    assert post.renditions['variants']['card']['width'] == 300, (
+        "Убедитесь, что команда `build_renditions` готовит копии для уже"
+        " загруженных изображений и не увеличивает маленькие."
+    )
+
+
+@pytest.mark.parametrize('rebuild', [False, True])
+def test_shared_renditions_are_kept(
+        media_root, mixer, post_with_published_location, rebuild):
+    post = post_with_published_location
+    post.image = _photo(300, 200)
+    post.save()
+    post.refresh_from_db()
+    shared = post.renditions
+    # Так посты делят заглушки после seed_data.
+    other = mixer.blend(Post, author=post.author, category=post.category)
+    Post.objects.filter(pk=other.pk).update(
+        image=post.image.name, renditions=shared)
+    if rebuild:
+        call_command('build_renditions', '--all')
+    else:
+        post.image = _photo(200, 100)
+        post.save()
+    for variant in shared['variants'].values():
+        assert (media_root / variant['webp']).exists(), (
+            "Убедитесь, что пересборка копий одного поста не удаляет"
+            " файлы, на которые ссылаются другие посты."
+        )
+    other.refresh_from_db()
+    other.image = _photo(200, 100)
+    other.save()
+    if not rebuild:
+        for variant in shared['variants'].values():
+            assert not (media_root / variant['webp']).exists(), (
+                "Убедитесь, что копии, на которые больше никто не"
+                " ссылается, удаляются."
+            )
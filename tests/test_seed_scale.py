@@ -0,0 +1,102 @@
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+VOLUMES = {
+    'users': 20, 'categories': 10, 'locations': 4, 'posts': 300,
+    'comments': 900, 'future_ratio': 0.1, 'unpublished_ratio': 0.1,
+    'batch_size': 64,
+}
+
+
+def seed(**options):
+    call_command('seed_scale', stdout=io.StringIO(), **{**VOLUMES, **options})
+
+
+def snapshot():
+    return (
+        list(Post.objects.order_by('pk').values_list(
+            'title', 'author_id', 'category_id', 'comment_count')),
+        list(Comment.objects.order_by('pk').values_list('post_id', 'text')),
+    )
+
+
+def test_creates_requested_volumes():
+    seed()
+    assert get_user_model().objects.count() == VOLUMES['users']
+    assert Category.objects.count() == VOLUMES['categories']
+    assert Location.objects.count() == VOLUMES['locations']
+    assert Post.objects.count() == VOLUMES['posts']
+    comments = Comment.objects.count()
+    assert VOLUMES['comments'] / 3 < comments < VOLUMES['comments'] * 3, (
+        'Убедитесь, что число комментариев близко к запрошенному.'
+    )
+    assert not Post.objects.repair_comment_counts(), (
+        'Убедитесь, что `comment_count` совпадает с созданными комментариями.'
+    )
+
+
+def test_rows_cover_edge_cases():
+    seed()
+    now = timezone.now()
+    assert Post.objects.filter(pub_date__gt=now).exists(), (
+        'Убедитесь, что `seed_scale` создаёт отложенные посты.'
+    )
+    assert Post.objects.filter(is_published=False).exists()
+    assert Category.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(location=None).exists()
+    assert not Comment.objects.filter(created_at__lt=F('post__pub_date'))\
+        .exists(), 'Убедитесь, что комментарии не старше своих постов.'
+    assert not Post.objects.filter(excerpt='').exists()
+
+
+def test_authors_are_skewed():
+    seed(skew=3.0)
+    per_author = sorted(
+        Post.objects.values('author').annotate(total=Count('pk'))
+        .values_list('total', flat=True), reverse=True)
+    assert per_author[0] > 5 * (VOLUMES['posts'] / VOLUMES['users']), (
+        'Убедитесь, что распределение постов по авторам перекошено.'
+    )
+
+
+def test_same_seed_gives_same_data():
+    seed(seed=7)
+    first = snapshot()
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+    get_user_model().objects.all().delete()
+    seed(seed=7)
+    assert snapshot() == first, (
+        'Убедитесь, что одинаковое зерно даёт одинаковые данные.'
+    )
+
+
+def test_appends_after_existing_rows(user):
+    seed(posts=10, comments=20)
+    seed(posts=10, comments=20)
+    assert Post.objects.count() == 20
+    assert not Post.objects.repair_comment_counts()
+
+
+def test_placeholder_images_share_renditions(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        seed(posts=40, comments=0, images=2, image_ratio=1.0)
+    images = set(Post.objects.values_list('image', flat=True))
+    assert len(images) == 2, (
+        'Убедитесь, что посты делят заранее созданные заглушки.'
+    )
+    post = Post.objects.first()
+    assert post.renditions['source'] == post.image.name
+    assert (tmp_path / post.image.name).exists()
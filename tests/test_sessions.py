@@ -0,0 +1,43 @@
+import pytest
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_logged_in_page_skips_session_table(user_client):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get('/')
+    assert response.status_code == 200
+    assert not [
+        query for query in captured.captured_queries
+        if 'django_session' in query['sql']
+    ], (
+        "Убедитесь, что сессия авторизованного пользователя читается из"
+        " кеша, а не из таблицы `django_session` на каждой странице."
+    )
+
+
+def test_logout_ends_session(user_client):
+    user_client.post('/auth/logout/')
+    response = user_client.get('/posts/create/')
+    assert response.status_code == 302, (
+        "Убедитесь, что после выхода сессия не восстанавливается из кеша."
+    )
+
+
+def test_many_sessions_stay_cached(django_assert_num_queries):
+    stores = []
+    for _ in range(400):
+        store = SessionStore()
+        store['visits'] = 1
+        store.create()
+        stores.append(store)
+    with django_assert_num_queries(0):
+        session = SessionStore(stores[0].session_key)
+        assert session['visits'] == 1, (
+            "Убедитесь, что кеш сессий вмещает больше 300 записей и старые"
+            " сессии не вытесняются в таблицу `django_session`."
+        )
@@ -0,0 +1,55 @@
+import importlib
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+from blogicum.settings.base import load_secret_key
+
+
+def test_prod_profile_strips_debug_tools():
+    prod = importlib.import_module('blogicum.settings.prod')
+    assert prod.DEBUG is False, (
+        "Убедитесь, что в профиле prod отключён DEBUG."
+    )
+    assert 'debug_toolbar' not in prod.INSTALLED_APPS
+    assert not any('debug_toolbar' in name for name in prod.MIDDLEWARE), (
+        "Убедитесь, что в профиле prod нет middleware панели отладки."
+    )
+    assert prod.DATABASES['default']['CONN_MAX_AGE'] > 0
+    assert 'Manifest' in prod.STATICFILES_STORAGE
+    loaders = prod.TEMPLATES[0]['OPTIONS']['loaders']
+    assert loaders[0][0] == 'django.template.loaders.cached.Loader'
+    assert 'memcached' in prod.CACHES['default']['BACKEND'], (
+        "Убедитесь, что в профиле prod кеш страниц и поколений общий для"
+        " всех процессов."
+    )
+    assert 'template_fragments' not in prod.CACHES
+    assert 'memcached' in prod.CACHES[prod.SESSION_CACHE_ALIAS]['BACKEND']
+
+
+def test_dev_profile_keeps_debug_toolbar():
+    dev = importlib.import_module('blogicum.settings.dev')
+    assert dev.DEBUG is True
+    assert 'debug_toolbar' in dev.INSTALLED_APPS
+
+
+def test_bench_startup_reports_both_profiles():
+    out = StringIO()
+    call_command(
+        'bench_startup', runs=1, repeat=1, json=True, stdout=out)
+    report = json.loads(out.getvalue())
+    assert set(report) == {'dev', 'prod'}
+    for values in report.values():
+        assert values['first_request_ms'] > 0
+
+
+def test_secret_key_file_is_created_once(tmp_path):
+    path = tmp_path / '.secret_key'
+    key = load_secret_key(path)
+    assert len(key) == 64 and load_secret_key(path) == key, (
+        "Убедитесь, что ключ создаётся один раз и затем читается из файла."
+    )
+    assert [item.name for item in tmp_path.iterdir()] == ['.secret_key'], (
+        "Убедитесь, что временный файл ключа удаляется."
+    )
@@ -0,0 +1,137 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.test import override_settings
+from django.utils import timezone
+
+from core import queue
+from core.mail import QueuedEmailBackend
+from core.management.commands.runworker import work
+from core.models import Task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@queue.task(name='tests.record', max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@queue.task(name='tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError('сбой')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+def _drain(worker_id='worker'):
+    work(worker_id, threading.Event(), 10, 60, 0, True)
+
+
+def test_enqueue_defers_execution():
+    task_obj = record.enqueue(1)
+    assert calls == [], (
+        "Убедитесь, что задача не выполняется в момент постановки в очередь."
+    )
+    assert task_obj.status == Task.QUEUED
+    assert task_obj.payload == {'args': [1], 'kwargs': {}}
+    _drain()
+    task_obj.refresh_from_db()
+    assert calls == [1]
+    assert task_obj.status == Task.DONE, (
+        "Убедитесь, что выполненная задача получает статус `done`."
+    )
+
+
+def test_eager_mode_runs_immediately():
+    with override_settings(TASKS_ALWAYS_EAGER=True):
+        assert record.enqueue(2) is None
+    assert calls == [2]
+    assert not Task.objects.exists()
+
+
+def test_claim_is_exclusive():
+    record.enqueue(3)
+    assert len(queue.claim('first', 10, 60)) == 1
+    assert queue.claim('second', 10, 60) == [], (
+        "Убедитесь, что арендованную задачу не забирает второй обработчик."
+    )
+
+
+def test_expired_lease_is_reclaimed():
+    task_obj = record.enqueue(4)
+    queue.claim('crashed', 10, 60)
+    Task.objects.filter(pk=task_obj.pk).update(
+        locked_until=timezone.now() - timedelta(seconds=1))
+    claimed = queue.claim('rescuer', 10, 60)
+    assert [item.pk for item in claimed] == [task_obj.pk], (
+        "Убедитесь, что задачу с истёкшей арендой забирает другой обработчик."
+    )
+    queue.run(claimed[0], 'rescuer')
+    task_obj.refresh_from_db()
+    assert task_obj.status == Task.DONE
+    assert task_obj.attempts == 2
+
+
+def test_failed_task_is_retried_then_marked_failed():
+    task_obj = explode.enqueue()
+    _drain()
+    task_obj.refresh_from_db()
+    assert task_obj.status == Task.QUEUED, (
+        "Убедитесь, что упавшая задача возвращается в очередь."
+    )
+    assert task_obj.run_at > timezone.now()
+    assert 'RuntimeError' in task_obj.last_error
+
+    Task.objects.filter(pk=task_obj.pk).update(run_at=timezone.now())
+    _drain()
+    task_obj.refresh_from_db()
+    assert task_obj.status == Task.FAILED, (
+        "Убедитесь, что после `max_attempts` попыток задача помечается "
+        "как упавшая."
+    )
+    assert task_obj.finished_at is not None
+
+
+@override_settings(
+    TASKS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+def test_email_is_sent_by_worker():
+    message = EmailMessage('Тема', 'Текст', 'from@example.com',
+                           ['to@example.com'])
+    QueuedEmailBackend().send_messages([message])
+    assert len(mail.outbox) == 0, (
+        "Убедитесь, что письмо не отправляется в момент запроса."
+    )
+    assert Task.objects.filter(name='core.tasks.send_email').count() == 1
+    _drain()
+    assert len(mail.outbox) == 1, (
+        "Убедитесь, что обработчик очереди отправляет письмо."
+    )
+    assert mail.outbox[0].subject == 'Тема'
+    assert mail.outbox[0].to == ['to@example.com']
+
+
+def test_post_image_change_enqueues_renditions(post_with_published_location):
+    post = post_with_published_location
+    # Копии уже собраны обработчиком.
+    post.renditions = {'source': post.image.name or None, 'variants': {}}
+    post.save()
+    Task.objects.all().delete()
+    post.title = 'Без смены изображения'
+    post.save()
+    assert not Task.objects.exists(), (
+        "Убедитесь, что копии изображения не пересобираются без его смены."
+    )
+    post.image = 'posts/new.jpg'
+    post.save()
+    task_obj = Task.objects.get()
+    assert task_obj.name == 'blog.tasks.build_post_renditions'
+    assert task_obj.payload['args'] == [post.pk]